@@ -0,0 +1,64 @@
+import threading
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit driven by measured latency.
+
+    Every admitted call reports its latency. The no-load baseline is a slowly rising
+    minimum; a sample slower than `tolerance` x baseline (or a failure) cuts the limit
+    by `backoff`, while fast samples add 1/limit (about +1 per limit's worth of calls)
+    as long as the current limit is actually being used. Calls over the limit are
+    rejected immediately instead of queueing.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        tolerance: float = 2.0,
+        backoff: float = 0.9,
+        baseline_drift: float = 0.001,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.baseline_drift = baseline_drift
+        self.baseline = None
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.in_flight >= int(self.limit):
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, latency: float = None, ok: bool = True):
+        """Frees the slot; `latency` (seconds) of a completed call updates the limit."""
+        with self._lock:
+            in_flight = self.in_flight
+            self.in_flight -= 1
+            if latency is None:
+                return
+
+            if self.baseline is None:
+                self.baseline = latency
+            else:
+                # Drifts up slowly so a permanently slower model re-baselines
+                self.baseline = min(self.baseline * (1 + self.baseline_drift), latency)
+
+            if not ok or latency > self.tolerance * self.baseline:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+            elif in_flight * 2 >= self.limit:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def retry_after(self) -> int:
+        """Seconds a shed client should wait: roughly one drain of the current queue."""
+        if self.baseline is None:
+            return 1
+        return max(1, round(self.baseline * self.tolerance * self.limit))
@@ -0,0 +1,177 @@
+import asyncio
+import socket
+import struct
+import time
+
+import numpy as np
+
+from src.api.metrics import PREDICT_IN_FLIGHT, QUEUE_WAIT, SHED_REJECTED
+from src.utils.logger import get_logger
+
+logger = get_logger("binary_server")
+
+# WIRE FORMAT (little-endian, length-prefixed frames)
+#   frame    := uint32 payload_length | payload
+#   request  := uint32 n_rows | int64[n] pickup_epoch | float32[n] per FLOAT_COLUMNS
+#   response := uint8 status | uint32 n_rows | float32[n] duration_seconds   (status 0)
+#             | uint8 status | utf-8 error message                          (status 1)
+# pickup_epoch is the naive NYC wall-clock time as seconds since 1970-01-01.
+FLOAT_COLUMNS = [
+    "passenger_count",
+    "pickup_longitude",
+    "pickup_latitude",
+    "dropoff_longitude",
+    "dropoff_latitude",
+]
+MAX_BATCH_ROWS = 100_000
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+_LENGTH = struct.Struct("<I")
+_RESPONSE_HEADER = struct.Struct("<BI")
+
+
+def encode_request(columns: dict) -> bytes:
+    epoch = np.ascontiguousarray(columns["pickup_epoch"], dtype="<i8")
+    parts = [_LENGTH.pack(len(epoch)), epoch.tobytes()]
+    for name in FLOAT_COLUMNS:
+        parts.append(np.ascontiguousarray(columns[name], dtype="<f4").tobytes())
+    payload = b"".join(parts)
+    return _LENGTH.pack(len(payload)) + payload
+
+
+def decode_request(payload: bytes) -> dict:
+    """Zero-copy views over the payload: one array per column, no per-row objects."""
+    (n_rows,) = _LENGTH.unpack_from(payload)
+    if n_rows > MAX_BATCH_ROWS:
+        raise ValueError(f"Batch of {n_rows} rows exceeds {MAX_BATCH_ROWS}")
+    expected = _LENGTH.size + n_rows * (8 + 4 * len(FLOAT_COLUMNS))
+    if len(payload) != expected:
+        raise ValueError(f"Payload is {len(payload)} bytes, expected {expected}")
+
+    offset = _LENGTH.size
+    columns = {"pickup_epoch": np.frombuffer(payload, "<i8", n_rows, offset)}
+    offset += 8 * n_rows
+    for name in FLOAT_COLUMNS:
+        columns[name] = np.frombuffer(payload, "<f4", n_rows, offset)
+        offset += 4 * n_rows
+    return columns
+
+
+def encode_response(seconds: np.ndarray) -> bytes:
+    payload = (
+        _RESPONSE_HEADER.pack(STATUS_OK, len(seconds))
+        + np.ascontiguousarray(seconds, dtype="<f4").tobytes()
+    )
+    return _LENGTH.pack(len(payload)) + payload
+
+
+def encode_error(message: str) -> bytes:
+    payload = bytes([STATUS_ERROR]) + message.encode()
+    return _LENGTH.pack(len(payload)) + payload
+
+
+def decode_response(payload: bytes) -> np.ndarray:
+    if payload[0] != STATUS_OK:
+        raise RuntimeError(payload[1:].decode())
+    _, n_rows = _RESPONSE_HEADER.unpack_from(payload)
+    return np.frombuffer(payload, "<f4", n_rows, _RESPONSE_HEADER.size)
+
+
+def _max_frame_bytes() -> int:
+    return _LENGTH.size + MAX_BATCH_ROWS * (8 + 4 * len(FLOAT_COLUMNS))
+
+
+async def serve(
+    predict_columns, host: str, port: int, limiter=None, max_concurrent: int = 2
+) -> asyncio.AbstractServer:
+    """
+    Starts the binary batch endpoint. `predict_columns(columns) -> seconds` runs in a worker
+    thread, so the event loop (and the REST API sharing it) stays responsive during inference.
+
+    Frames go through the same saturation signals as /predict (in-flight gauge, queue wait)
+    and at most `max_concurrent` run at once. With a `limiter` (the API's AdaptiveLimiter)
+    each frame also takes one admission slot and is answered with an error when it is full.
+    """
+    slots = asyncio.Semaphore(max_concurrent)
+
+    def admitted(columns, received_at):
+        QUEUE_WAIT.observe(time.perf_counter() - received_at)
+        if limiter is None:
+            return predict_columns(columns)
+        if not limiter.try_acquire():
+            SHED_REJECTED.inc()
+            raise RuntimeError(
+                f"Server overloaded, retry after {limiter.retry_after()}s"
+            )
+        # A frame holds one slot; its latency is not a per-trip signal.
+        try:
+            return predict_columns(columns)
+        finally:
+            limiter.release()
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(_LENGTH.size)
+                except asyncio.IncompleteReadError:
+                    break  # client closed the connection between frames
+                (length,) = _LENGTH.unpack(header)
+                if length > _max_frame_bytes():
+                    writer.write(encode_error(f"Frame of {length} bytes is too large"))
+                    break
+                payload = await reader.readexactly(length)
+
+                received_at = time.perf_counter()
+                PREDICT_IN_FLIGHT.inc()
+                try:
+                    columns = decode_request(payload)
+                    async with slots:
+                        seconds = await asyncio.to_thread(
+                            admitted, columns, received_at
+                        )
+                    writer.write(encode_response(seconds))
+                except Exception as e:
+                    logger.error(f"❌ BINARY BATCH ERROR: {e}")
+                    writer.write(encode_error(str(e)))
+                finally:
+                    PREDICT_IN_FLIGHT.dec()
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    logger.info(
+        f"⚡ BINARY BATCH ENDPOINT LISTENING ON {host}:{port} "
+        f"(max {max_concurrent} concurrent, admission={'on' if limiter else 'off'})"
+    )
+    return server
+
+
+class BinaryClient:
+    """Blocking client that keeps one connection open and sends one frame per batch."""
+
+    def __init__(self, host: str = "localhost", port: int = 9000, timeout: float = 30):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def _read_exactly(self, size: int) -> bytes:
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        while view:
+            received = self.sock.recv_into(view)
+            if not received:
+                raise ConnectionError("Server closed the connection")
+            view = view[received:]
+        return bytes(buffer)
+
+    def predict(self, columns: dict) -> np.ndarray:
+        self.sock.sendall(encode_request(columns))
+        (length,) = _LENGTH.unpack(self._read_exactly(_LENGTH.size))
+        return decode_response(self._read_exactly(length))
+
+    def close(self):
+        self.sock.close()
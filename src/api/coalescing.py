@@ -0,0 +1,108 @@
+import threading
+import time
+import uuid
+
+# Deletes the lock only if we still own it (it may have expired and been re-taken).
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    De-duplicates concurrent calls inside one worker: the first caller for a key
+    runs the function, every caller arriving before it finishes waits and shares its result.
+    A follower waits at most `wait_timeout` seconds, then runs the function itself, so
+    one hung leader cannot stall every request for its key.
+    """
+
+    def __init__(self, wait_timeout: float = 5.0):
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def in_progress(self, key) -> bool:
+        """True if a leader is currently computing `key` (a new caller would follow)."""
+        return key in self._calls
+
+    def do(self, key, fn):
+        """Returns (result, shared) where shared is True if another caller computed it."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if not call.done.wait(self.wait_timeout):
+                return fn(), False
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, False
+
+
+class RedisLock:
+    """
+    Short-lived cross-pod lock (SET NX PX). Used so only one pod computes a key;
+    the others poll the cache until the owner's SETEX lands or the lock expires.
+    """
+
+    def __init__(self, client, ttl_ms: int = 2000, poll_interval: float = 0.01):
+        self.client = client
+        self.ttl_ms = ttl_ms
+        self.poll_interval = poll_interval
+        self._release = client.register_script(_RELEASE_SCRIPT)
+
+    @staticmethod
+    def _lock_key(key):
+        return b"lock:" + key if isinstance(key, bytes) else f"lock:{key}"
+
+    def acquire(self, key):
+        """Returns an ownership token, or None if another pod holds the lock."""
+        token = uuid.uuid4().hex
+        if self.client.set(self._lock_key(key), token, nx=True, px=self.ttl_ms):
+            return token
+        return None
+
+    def release(self, key, token: str):
+        self._release(keys=[self._lock_key(key)], args=[token])
+
+    def wait_for_value(self, key, fetch=None):
+        """
+        Polls `key` (read with `fetch`, default GET) while the lock is held elsewhere;
+        returns None on timeout.
+        """
+        fetch = fetch or self.client.get
+        deadline = time.monotonic() + self.ttl_ms / 1000
+        while time.monotonic() < deadline:
+            value = fetch(key)
+            if value:
+                return value
+            if not self.client.exists(self._lock_key(key)):
+                return fetch(key)
+            time.sleep(self.poll_interval)
+        return None
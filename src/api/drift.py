@@ -0,0 +1,101 @@
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from src.api.metrics import DRIFT_OBSERVATIONS, DRIFT_PSI
+from src.components.drift import bin_counts, psi
+from src.components.feature_engineering import create_features
+from src.config import FEATURES
+from src.utils.logger import get_logger
+
+logger = get_logger("api_service")
+
+
+class DriftMonitor:
+    """
+    Streaming drift sketches for the 12 model features and the prediction.
+
+    The request path only appends (raw input, prediction) to a bounded deque, an O(1)
+    lock-free operation. A background thread drains it every `interval` seconds,
+    featurizes the batch vectorized, folds it into exponentially decayed histograms
+    (constant memory: one fixed-size bin array per column) and publishes the PSI
+    against the training reference as Prometheus gauges.
+    """
+
+    def __init__(
+        self,
+        reference: dict,
+        interval: float = 15.0,
+        decay: float = 0.9,
+        max_buffer: int = 10000,
+    ):
+        self.reference = reference
+        self.columns = [name for name in [*FEATURES, "prediction"] if name in reference]
+        self.edges = {
+            name: np.asarray(reference[name]["edges"]) for name in self.columns
+        }
+        self.counts = {
+            name: np.zeros(len(self.edges[name]) + 1) for name in self.columns
+        }
+        self.interval = interval
+        self.decay = decay
+        self._buffer = deque(maxlen=max_buffer)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def observe(self, record: dict, pred_seconds: float):
+        self._buffer.append((record, pred_seconds))
+
+    def flush(self) -> dict:
+        """Folds buffered observations into the sketches and returns the current PSI scores."""
+        batch = []
+        while self._buffer:
+            try:
+                batch.append(self._buffer.popleft())
+            except IndexError:
+                break
+        if not batch:
+            return {}
+
+        df = pd.DataFrame([record for record, _ in batch])
+        df["prediction"] = [pred for _, pred in batch]
+
+        # Requests carry free-form datetime strings: parse each on its own and drop
+        # only the ones that fail, so one odd format cannot cost the whole window.
+        df["pickup_datetime"] = pd.to_datetime(
+            df["pickup_datetime"], format="mixed", errors="coerce"
+        )
+        unparsed = df["pickup_datetime"].isna()
+        if unparsed.any():
+            logger.warning(f"⚠️ DRIFT: SKIPPED {unparsed.sum()} UNPARSEABLE DATETIMES")
+            df = df[~unparsed]
+        if df.empty:
+            return {}
+        df = create_features(df)
+
+        scores = {}
+        for name in self.columns:
+            self.counts[name] = self.counts[name] * self.decay + bin_counts(
+                df[name].to_numpy(dtype=np.float64), self.edges[name]
+            )
+            scores[name] = psi(self.reference[name]["proportions"], self.counts[name])
+            DRIFT_PSI.labels(name).set(scores[name])
+
+        DRIFT_OBSERVATIONS.inc(len(batch))
+        return scores
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"⚠️ DRIFT UPDATE FAILED: {e}")
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="drift", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,161 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from src.api.schemas import TaxiInput
+from src.components.feature_engineering import create_features
+from src.config import FEATURES, RAW_INPUTS
+from src.utils.geo_utils import (
+    calculate_bearing,
+    dummy_manhattan_distance,
+    haversine_array,
+)
+
+
+def build_feature_feed(data: TaxiInput, input_name: str) -> dict:
+    df = pd.DataFrame([data.model_dump()])
+    df = create_features(df)
+    return {input_name: df[FEATURES].astype(np.float32).to_numpy()}
+
+
+def build_raw_feed(data: TaxiInput) -> dict:
+    """Fused models compute the features in-graph; only the timestamp is split here."""
+    pickup = pd.Timestamp(data.pickup_datetime)
+    values = {
+        "passenger_count": data.passenger_count,
+        "pickup_longitude": data.pickup_longitude,
+        "pickup_latitude": data.pickup_latitude,
+        "dropoff_longitude": data.dropoff_longitude,
+        "dropoff_latitude": data.dropoff_latitude,
+        "month": pickup.month,
+        "day_of_week": pickup.dayofweek,
+        "hour": pickup.hour,
+    }
+    return {name: np.array([[values[name]]], dtype=np.float32) for name in RAW_INPUTS}
+
+
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+
+def pickup_epoch(pickup_datetime: str) -> int:
+    """
+    Naive wall-clock epoch seconds of one pickup_datetime, read the way build_raw_feed
+    reads it (an offset, if any, is dropped). Raises ValueError if it does not parse.
+    """
+    try:
+        pickup = datetime.fromisoformat(pickup_datetime)
+    except ValueError:
+        pickup = pd.Timestamp(pickup_datetime)
+        if pickup is pd.NaT:
+            raise ValueError(f"Invalid pickup_datetime: {pickup_datetime!r}") from None
+    if pickup.tzinfo is not None:
+        pickup = pickup.replace(tzinfo=None)
+    return (pickup - _EPOCH) // _SECOND
+
+
+def time_components(pickup_epoch: np.ndarray):
+    """(month, day_of_week [Mon=0], hour) from naive local-time epoch seconds, vectorized."""
+    pickup = pickup_epoch.astype("datetime64[s]")
+    month = pickup.astype("datetime64[M]").astype(np.int64) % 12 + 1
+    # 1970-01-01 was a Thursday (dayofweek 3)
+    day_of_week = (pickup.astype("datetime64[D]").astype(np.int64) + 3) % 7
+    hour = (pickup_epoch // 3600) % 24
+    return month, day_of_week, hour
+
+
+def build_batch_feed(columns: dict, input_name: str, fused: bool) -> dict:
+    """
+    Columnar counterpart of build_feed: `columns` holds 1-D arrays for pickup_epoch and the
+    five numeric TaxiInput fields. No per-row Python objects or DataFrames are created.
+    """
+    month, day_of_week, hour = time_components(columns["pickup_epoch"])
+    raw = {
+        "passenger_count": columns["passenger_count"],
+        "pickup_longitude": columns["pickup_longitude"],
+        "pickup_latitude": columns["pickup_latitude"],
+        "dropoff_longitude": columns["dropoff_longitude"],
+        "dropoff_latitude": columns["dropoff_latitude"],
+        "month": month,
+        "day_of_week": day_of_week,
+        "hour": hour,
+    }
+    if fused:
+        return {
+            name: raw[name].astype(np.float32).reshape(-1, 1) for name in RAW_INPUTS
+        }
+
+    coords = [
+        raw[name].astype(np.float64)
+        for name in (
+            "pickup_latitude",
+            "pickup_longitude",
+            "dropoff_latitude",
+            "dropoff_longitude",
+        )
+    ]
+    raw["is_weekend"] = (day_of_week >= 5).astype(np.int64)
+    raw["distance_haversine"] = haversine_array(*coords)
+    raw["distance_manhattan"] = dummy_manhattan_distance(*coords)
+    raw["bearing"] = calculate_bearing(*coords)
+
+    X = np.empty((len(month), len(FEATURES)), dtype=np.float32)
+    for i, name in enumerate(FEATURES):
+        X[:, i] = raw[name]
+    return {input_name: X}
+
+
+def decode_batch_seconds(results, fused: bool) -> np.ndarray:
+    if fused:
+        return results[0].ravel()
+    return np.expm1(results[0].ravel())
+
+
+def build_feed(data: TaxiInput, input_name: str, fused: bool) -> dict:
+    return build_raw_feed(data) if fused else build_feature_feed(data, input_name)
+
+
+def decode_outputs(results, fused: bool):
+    """
+    Returns (seconds, quantile seconds or None) for the first row.
+    Fused models return seconds, minutes[, quantile seconds]; others log-scale mean[, quantiles].
+    """
+    if fused:
+        pred_seconds = results[0].item()
+        quantiles = results[2][0] if len(results) > 2 else None
+    else:
+        pred_seconds = np.expm1(results[0].item())
+        quantiles = np.expm1(results[1][0]) if len(results) > 1 else None
+    return pred_seconds, quantiles
+
+
+def format_response(pred_seconds, quantiles) -> dict:
+    response = {
+        "predicted_duration_seconds": round(float(pred_seconds), 2),
+        "predicted_duration_minutes": round(float(pred_seconds / 60), 2),
+    }
+    if quantiles is not None:
+        response["predicted_duration_p10_seconds"] = round(float(quantiles[0]), 2)
+        response["predicted_duration_p90_seconds"] = round(float(quantiles[1]), 2)
+    return response
+
+
+def is_fused_model(session) -> bool:
+    """True if an InferenceSession expects raw trip fields instead of the 12 features."""
+    return [i.name for i in session.get_inputs()] == RAW_INPUTS
+
+
+class ModelHandle:
+    """An InferenceSession plus what is needed to feed it and read its outputs."""
+
+    def __init__(self, session, path: str, version: str = None):
+        self.session = session
+        self.path = path
+        self.version = version
+        self.input_name = session.get_inputs()[0].name
+        self.fused = is_fused_model(session)
+
+    def predict(self, data: TaxiInput):
+        results = self.session.run(None, build_feed(data, self.input_name, self.fused))
+        return decode_outputs(results, self.fused)
@@ -1,18 +1,61 @@
 import hashlib
+import hmac
 import json
 import os
+import time
 from contextlib import asynccontextmanager
 
 import numpy as np
 import onnxruntime as rt
-import pandas as pd
 import redis
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import PlainTextResponse
 from prometheus_fastapi_instrumentator import Instrumentator
 
-from src.api.schemas import PredictionOutput, TaxiInput
-from src.components.feature_engineering import create_features
-from src.config import MODEL_SAVE_PATH
+from src.api import binary_server
+from src.api.admission import AdaptiveLimiter
+from src.api.coalescing import RedisLock, SingleFlight
+from src.api.drift import DriftMonitor
+from src.api.inference import (
+    ModelHandle,
+    build_batch_feed,
+    build_feed,
+    decode_batch_seconds,
+    decode_outputs,
+    format_response,
+    is_fused_model,
+    pickup_epoch,
+)
+from src.api.metrics import (
+    ADMISSION_LIMIT,
+    CACHE_HIT,
+    CACHE_MISS,
+    COALESCED_REQUESTS,
+    MODEL_ERRORS,
+    MODEL_PREDICTIONS,
+    NEARBY_HIT,
+    NEARBY_MISS,
+    SHED_DEGRADED,
+    SHED_REJECTED,
+    SaturationMiddleware,
+    observe_queue_wait,
+    track_stage,
+)
+from src.api.model_pool import ModelPool
+from src.api.nearby_cache import NearbyCache
+from src.api.profiling import sample_stacks, snapshot_allocations
+from src.api.response_cache import ResponseCache
+from src.api.schemas import BatchInput, BatchOutput, PredictionOutput, TaxiInput
+from src.api.shadow import ShadowScorer
+from src.components.drift import load_reference
+from src.components.model_registry import VERSION_PATTERN, ModelRegistry
+from src.components.speed_lookup import estimate_seconds, load_lookup
+from src.config import (
+    DRIFT_REFERENCE_PATH,
+    MODEL_REGISTRY_DIR,
+    MODEL_SAVE_PATH,
+    SPEED_LOOKUP_PATH,
+)
 from src.utils.logger import get_logger
 
 # LOGGER
@@ -21,40 +64,181 @@ logger = get_logger("api_service")
 # GLOBAL VARIABLES
 model = None
 input_name = None
+fused_model = False
 cache = None
 redis_available = False
+redis_lock = None
+response_cache = ResponseCache(None)
+nearby_cache = None
+model_pool = None
+shadow = None
+drift_monitor = None
+in_flight = SingleFlight()
+admission = AdaptiveLimiter()
+speed_lookup = None
+
+
+def file_version(path: str) -> str:
+    """Short content hash of the model file; prefixes cache keys so answers never outlive it."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:8]
 
 
 # LIFESPAN
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global model, input_name, cache, redis_available
+    global model, input_name, fused_model, cache, redis_available, redis_lock
+    global response_cache, nearby_cache, model_pool
+    global shadow, drift_monitor, admission, speed_lookup
+    binary = None
 
     # 1. REDIS
     REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
     try:
-        cache = redis.Redis(
-            host=REDIS_HOST, port=6379, decode_responses=True, socket_connect_timeout=1
-        )
+        # Bytes mode: compact cache values are raw float32s
+        cache = redis.Redis(host=REDIS_HOST, port=6379, socket_connect_timeout=1)
         cache.ping()
         redis_available = True
         logger.info(f"✅ REDIS CONNECTED: {REDIS_HOST}")
+
+        # Optional cross-pod de-duplication of cache misses
+        if os.getenv("CACHE_LOCK_ENABLED", "false").lower() == "true":
+            redis_lock = RedisLock(cache)
+            logger.info("🔒 REDIS MISS LOCK ENABLED")
     except Exception as e:
         logger.warning(f"⚠️ REDIS FAILED: {e}")
         redis_available = False
 
-    # 2. LOAD THE MODEL
+    # 2. LOAD THE MODEL (registry version if one is published, else the fixed file)
+    registry = ModelRegistry(MODEL_REGISTRY_DIR)
+    serving_version = os.getenv("MODEL_VERSION") or registry.current()
     try:
-        model = rt.InferenceSession(MODEL_SAVE_PATH)
+        if serving_version:
+            model = rt.InferenceSession(registry.load_bytes(serving_version))
+            model_source = f"{MODEL_REGISTRY_DIR}/{serving_version}"
+        else:
+            model = rt.InferenceSession(MODEL_SAVE_PATH)
+            serving_version = file_version(MODEL_SAVE_PATH)
+            model_source = MODEL_SAVE_PATH
         input_name = model.get_inputs()[0].name
-        logger.info(f"✅ MODEL LOADED: {MODEL_SAVE_PATH}")
+        fused_model = is_fused_model(model)
+        logger.info(
+            f"✅ MODEL LOADED: {model_source} "
+            f"(version={serving_version}, fused={fused_model})"
+        )
     except Exception as e:
         logger.error(f"❌ MODEL LOAD ERROR: {e}")
         raise e
 
+    # Other registry versions load on demand for requests that pin them
+    model_pool = ModelPool(registry, max_loaded=int(os.getenv("MODEL_POOL_SIZE", "3")))
+
+    # Cache keys are prefixed with the model version
+    response_cache = ResponseCache(
+        cache if redis_available else None,
+        encoding=os.getenv("CACHE_ENCODING", "json"),
+        group_by_cell=os.getenv("CACHE_GROUP_BY_CELL", "false").lower() == "true",
+        cell_buckets=int(os.getenv("CACHE_CELL_BUCKETS", "64")),
+        max_fields=int(os.getenv("CACHE_HASH_MAX_FIELDS", "128")),
+        model_version=serving_version,
+        read_legacy=os.getenv("CACHE_READ_LEGACY_KEYS", "false").lower() == "true",
+    )
+    logger.info(
+        f"🗃️ CACHE ENCODING: {os.getenv('CACHE_ENCODING', 'json')} "
+        f"(grouped={response_cache.group_by_cell}, "
+        f"model version={response_cache.model_version}, "
+        f"legacy reads={response_cache.read_legacy})"
+    )
+
+    # Opt-in approximate reuse: answers can come from a nearby trip's prediction
+    if os.getenv("NEARBY_CACHE", "false").lower() == "true":
+        nearby_cache = NearbyCache(
+            tolerance_m=float(os.getenv("NEARBY_TOLERANCE_M", "150")),
+            max_entries=int(os.getenv("NEARBY_MAX_ENTRIES", "50000")),
+        )
+        logger.info(
+            f"📍 NEARBY CACHE ON (tolerance {nearby_cache.tolerance_m:.0f} m, "
+            f"{nearby_cache.max_entries} trips)"
+        )
+
+    # 3. OPTIONAL CANDIDATE MODEL (shadow scoring / canary split)
+    candidate_path = os.getenv("CANDIDATE_MODEL_PATH")
+    if candidate_path:
+        try:
+            # One intra-op thread so background shadow runs cannot starve the primary.
+            options = rt.SessionOptions()
+            options.intra_op_num_threads = 1
+            candidate = ModelHandle(
+                rt.InferenceSession(candidate_path, options), candidate_path
+            )
+            shadow = ShadowScorer(
+                candidate,
+                sample_rate=float(os.getenv("SHADOW_SAMPLE_RATE", "0.1")),
+                canary_weight=float(os.getenv("CANARY_WEIGHT", "0")),
+            )
+            logger.info(
+                f"🌓 CANDIDATE LOADED: {candidate_path} "
+                f"(shadow={shadow.sample_rate}, canary={shadow.canary_weight})"
+            )
+        except Exception as e:
+            logger.error(f"❌ CANDIDATE LOAD ERROR (continuing without it): {e}")
+            shadow = None
+
+    # 4. DRIFT MONITOR (needs the reference saved by the training pipeline)
+    if os.path.exists(DRIFT_REFERENCE_PATH):
+        drift_monitor = DriftMonitor(
+            load_reference(DRIFT_REFERENCE_PATH),
+            interval=float(os.getenv("DRIFT_INTERVAL_SECONDS", "15")),
+        )
+        drift_monitor.start()
+        logger.info(f"📈 DRIFT MONITOR STARTED: {DRIFT_REFERENCE_PATH}")
+    else:
+        logger.warning(f"⚠️ NO DRIFT REFERENCE AT {DRIFT_REFERENCE_PATH}")
+
+    # 5. ADMISSION CONTROL (+ optional lookup-table answers while overloaded)
+    if os.getenv("ADMISSION_CONTROL", "true").lower() == "true":
+        admission = AdaptiveLimiter(
+            initial_limit=int(os.getenv("ADMISSION_INITIAL_LIMIT", "20")),
+            max_limit=int(os.getenv("ADMISSION_MAX_LIMIT", "200")),
+            tolerance=float(os.getenv("ADMISSION_LATENCY_TOLERANCE", "2.0")),
+        )
+        ADMISSION_LIMIT.set(admission.limit)
+        logger.info(f"🚦 ADMISSION CONTROL ON (initial limit {admission.limit:.0f})")
+    else:
+        admission = None
+
+    if os.getenv("DEGRADED_MODE", "off") == "lookup":
+        if os.path.exists(SPEED_LOOKUP_PATH):
+            speed_lookup = load_lookup(SPEED_LOOKUP_PATH)
+            logger.info(f"🛟 DEGRADED MODE: LOOKUP TABLE {SPEED_LOOKUP_PATH}")
+        else:
+            logger.warning(f"⚠️ NO SPEED LOOKUP AT {SPEED_LOOKUP_PATH}")
+
+    # 6. OPTIONAL BINARY BATCH ENDPOINT (same process, same InferenceSession)
+    # Loopback only unless BINARY_HOST says otherwise: the port has no auth of its own.
+    binary_port = os.getenv("BINARY_PORT")
+    if binary_port:
+        binary = await binary_server.serve(
+            predict_columns,
+            os.getenv("BINARY_HOST", "127.0.0.1"),
+            int(binary_port),
+            limiter=admission,
+            max_concurrent=int(os.getenv("BINARY_MAX_CONCURRENT", "2")),
+        )
+
     yield
 
-    # 3. CLEANUP
+    # 7. CLEANUP
+    if binary:
+        binary.close()
+        await binary.wait_closed()
+    if drift_monitor:
+        drift_monitor.stop()
+    if shadow:
+        shadow.close()
     if cache:
         cache.close()
     logger.info("🛑 SHUTDOWN")
@@ -63,11 +247,11 @@ async def lifespan(app: FastAPI):
 # --- APP INITIALIZATION ---
 app = FastAPI(title="NYC Taxi API", version="2.0", lifespan=lifespan)
 Instrumentator().instrument(app).expose(app)
+app.add_middleware(SaturationMiddleware)
 
 
-def generate_cache_key(data: TaxiInput) -> str:
-    data_str = json.dumps(data.model_dump(), sort_keys=True)
-    return hashlib.md5(data_str.encode()).hexdigest()
+def generate_cache_key(data: TaxiInput, version: str = None):
+    return response_cache.key(data, version)
 
 
 @app.get("/")
@@ -75,59 +259,301 @@ def root():
     return {"message": "NYC TAXI PREDICTION API IS LIVE"}
 
 
+def pinned_model(version: str):
+    """Registry handle for a request's model_version; None means the serving model."""
+    if version is None or version == response_cache.model_version:
+        return None
+    try:
+        if model_pool is None:
+            raise KeyError(version)
+        return model_pool.get(version)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown model version {version}")
+
+
+def run_primary(data: TaxiInput):
+    """Serving-model inference plus the shadow and nearby-index bookkeeping."""
+    # Data Preparation
+    with track_stage("features"):
+        feed = build_feed(data, input_name, fused_model)
+
+    # Inference
+    with track_stage("inference"):
+        start = time.perf_counter()
+        try:
+            results = model.run(None, feed)
+        except Exception:
+            MODEL_ERRORS.inc()
+            raise
+        inference_latency = time.perf_counter() - start
+
+    pred_seconds, quantiles = decode_outputs(results, fused_model)
+    MODEL_PREDICTIONS.labels("primary").inc()
+    if nearby_cache is not None:
+        nearby_cache.put(data, pred_seconds, quantiles)
+    if shadow:
+        shadow.submit(data, pred_seconds, inference_latency)
+    return pred_seconds, quantiles
+
+
+def observe_drift(data: TaxiInput, body):
+    """
+    Feeds a served answer to the drift monitor. Called for every unpinned answer,
+    whichever path produced it (cache, nearby trip, own or coalesced inference), so hot
+    trips weigh in the sketches as often as they are served. Answers from a pinned
+    version and load-shed estimates do not come from the serving model and are left out.
+    """
+    if drift_monitor:
+        seconds = json.loads(body)["predicted_duration_seconds"]
+        drift_monitor.observe(data.model_dump(), seconds)
+
+
+def run_prediction(data: TaxiInput, cache_key: str, pinned: ModelHandle = None) -> str:
+    """Featurizes, runs the model and caches the encoded response for one trip."""
+    token = None
+    if redis_lock:
+        token = redis_lock.acquire(cache_key)
+        if token is None:
+            # Another pod is computing this key; reuse its answer if it lands in time.
+            cached = redis_lock.wait_for_value(cache_key, response_cache.get)
+            if cached:
+                return cached
+
+    try:
+        if pinned is not None:
+            # A caller-pinned version answers as-is: no canary, shadow or drift
+            with track_stage("inference"):
+                pred_seconds, quantiles = pinned.predict(data)
+            MODEL_PREDICTIONS.labels("pinned").inc()
+        elif shadow and shadow.route_canary():
+            # Canary: a weighted share of requests is answered by the candidate
+            with track_stage("inference"):
+                pred_seconds, quantiles = shadow.candidate.predict(data)
+            MODEL_PREDICTIONS.labels("canary").inc()
+            # Not cached: the shared key would otherwise serve canary answers to everyone.
+            return json.dumps(format_response(pred_seconds, quantiles))
+        else:
+            pred_seconds, quantiles = run_primary(data)
+
+        with track_stage("encode"):
+            body = json.dumps(format_response(pred_seconds, quantiles))
+
+        # CACHE SAVE (keys carry the version that produced the answer)
+        if redis_available:
+            with track_stage("cache_set"):
+                response_cache.set(cache_key, pred_seconds, quantiles, body)
+
+        return body
+    finally:
+        if token:
+            redis_lock.release(cache_key, token)
+
+
+def predict_columns(columns: dict, pinned: ModelHandle = None):
+    """Scores a columnar batch (binary endpoint, /predict/batch) with one session run."""
+    if pinned is None:
+        session, name, fused, label = model, input_name, fused_model, "primary"
+    else:
+        session, name, fused = pinned.session, pinned.input_name, pinned.fused
+        label = "pinned"
+    with track_stage("features"):
+        feed = build_batch_feed(columns, name, fused)
+    with track_stage("inference"):
+        results = session.run(None, feed)
+    seconds = decode_batch_seconds(results, fused)
+    MODEL_PREDICTIONS.labels(label).inc(len(seconds))
+    return seconds
+
+
+class Overloaded(Exception):
+    """No admission slot was free for an inference (followers of the call see it too)."""
+
+
+def admitted(fn, *args):
+    """Runs fn(*args) holding an admission slot, feeding its latency to the limiter."""
+    if not admission:
+        return fn(*args)
+    if not admission.try_acquire():
+        raise Overloaded()
+    start, ok = time.perf_counter(), False
+    try:
+        result = fn(*args)
+        ok = True
+        return result
+    finally:
+        admission.release(time.perf_counter() - start, ok)
+        ADMISSION_LIMIT.set(admission.limit)
+
+
+def shed_load(data: TaxiInput) -> Response:
+    """Answer for a cache miss over the concurrency limit: lookup estimate or 503."""
+    if speed_lookup:
+        SHED_DEGRADED.inc()
+        body = json.dumps(format_response(estimate_seconds(speed_lookup, data), None))
+        return Response(
+            content=body,
+            media_type="application/json",
+            headers={"X-Degraded": "lookup"},
+        )
+
+    raise overloaded()
+
+
+def overloaded() -> HTTPException:
+    SHED_REJECTED.inc()
+    return HTTPException(
+        status_code=503,
+        detail="Server overloaded, retry later",
+        headers={"Retry-After": str(admission.retry_after())},
+    )
+
+
 @app.post("/predict", response_model=PredictionOutput)
-def predict(data: TaxiInput):
+def predict(
+    data: TaxiInput,
+    request: Request,
+    model_version: str = Query(None, pattern=VERSION_PATTERN),
+):
+    observe_queue_wait(request)
     if not model:
         raise HTTPException(status_code=503, detail="Model service not ready")
 
     try:
+        # Optional pin to a registry version (loaded once, then kept in the pool)
+        pinned = pinned_model(model_version)
+
         # 1. CACHE CHECK
-        cache_key = generate_cache_key(data)
+        with track_stage("cache_key"):
+            try:
+                cache_key = generate_cache_key(data, pinned and pinned.version)
+            except ValueError as e:  # pickup_datetime does not parse
+                raise HTTPException(status_code=422, detail=str(e))
         if redis_available:
-            cached = cache.get(cache_key)
+            with track_stage("cache_get"):
+                # Legacy keys predate versions: only the serving model may reuse them
+                cached = response_cache.get(cache_key, None if pinned else data)
             if cached:
+                CACHE_HIT.inc()
                 logger.info("⚡ CACHE HIT")
-                return json.loads(cached)
-
-        # 2. PREDICTION
-        # Data Preparation
-        df = pd.DataFrame([data.model_dump()])
-        df = create_features(df)
-
-        features = [
-            "passenger_count",
-            "pickup_longitude",
-            "pickup_latitude",
-            "dropoff_longitude",
-            "dropoff_latitude",
-            "month",
-            "day_of_week",
-            "hour",
-            "is_weekend",
-            "distance_haversine",
-            "distance_manhattan",
-            "bearing",
-        ]
-
-        X = df[features].astype(np.float32).to_numpy()
-
-        # Inference
-        results = model.run(None, {input_name: X})
-
-        log_pred = results[0].item()
-        pred_seconds = np.expm1(log_pred)
-
-        response = {
-            "predicted_duration_seconds": round(float(pred_seconds), 2),
-            "predicted_duration_minutes": round(float(pred_seconds / 60), 2),
-        }
-
-        # 3. CACHE SAVE
-        if redis_available:
-            cache.setex(cache_key, 3600, json.dumps(response))
+                if pinned is None:
+                    observe_drift(data, cached)
+                return Response(content=cached, media_type="application/json")
+            CACHE_MISS.inc()
+
+        # 2. NEARBY TRIP (same hour and weekday, pickup and dropoff within tolerance)
+        if nearby_cache is not None and pinned is None:
+            with track_stage("nearby_get"):
+                nearby = nearby_cache.get(data)
+            if nearby:
+                NEARBY_HIT.inc()
+                body = json.dumps(format_response(*nearby))
+                observe_drift(data, body)
+                return Response(
+                    content=body,
+                    media_type="application/json",
+                    headers={"X-Approximate": "nearby"},
+                )
+            NEARBY_MISS.inc()
 
-        return response
+        # 3. PREDICTION (concurrent misses for the same key share one inference).
+        # Admission is taken inside the shared call, so only the caller that actually
+        # runs the model holds a slot: followers wait for free, and a follower that
+        # gives up waiting must be admitted like any other miss.
+        try:
+            body, shared = in_flight.do(
+                cache_key, lambda: admitted(run_prediction, data, cache_key, pinned)
+            )
+        except Overloaded:
+            return shed_load(data)
+        if shared:
+            COALESCED_REQUESTS.inc()
+        if pinned is None:
+            observe_drift(data, body)
 
+        return Response(content=body, media_type="application/json")
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ ERROR: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/predict/batch", response_model=BatchOutput)
+def predict_batch(
+    batch: BatchInput,
+    request: Request,
+    model_version: str = Query(None, pattern=VERSION_PATTERN),
+):
+    """Scores a list of trips with one session run (e.g. the UI's what-if grids)."""
+    observe_queue_wait(request)
+    if not model:
+        raise HTTPException(status_code=503, detail="Model service not ready")
+    pinned = pinned_model(model_version)
+
+    # Datetimes are parsed per trip, so any mix of formats works; bad ones are a 422
+    trips = batch.trips
+    epochs = np.empty(len(trips), np.int64)
+    for i, trip in enumerate(trips):
+        try:
+            epochs[i] = pickup_epoch(trip.pickup_datetime)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=f"trips[{i}]: {e}")
+
+    # A batch holds one admission slot; its latency is not a per-trip signal.
+    if admission and not admission.try_acquire():
+        raise overloaded()
+    try:
+        columns = {"pickup_epoch": epochs}
+        for name in binary_server.FLOAT_COLUMNS:
+            columns[name] = np.array([getattr(t, name) for t in trips], np.float32)
+        seconds = predict_columns(columns, pinned).astype(np.float64)
+    except Exception as e:
+        logger.error(f"❌ BATCH ERROR: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if admission:
+            admission.release()
+
+    return {
+        "predicted_duration_seconds": np.round(seconds, 2).tolist(),
+        "predicted_duration_minutes": np.round(seconds / 60, 2).tolist(),
+    }
+
+
+# --- ADMIN: OPT-IN PROFILING ---
+# Disabled unless ADMIN_TOKEN is set; callers must send it as X-Admin-Token.
+def require_admin(x_admin_token: str = Header(None)):
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if not admin_token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@app.get(
+    "/admin/profile/cpu",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(require_admin)],
+)
+def profile_cpu(
+    seconds: float = Query(10, gt=0, le=60),
+    interval_ms: float = Query(5, ge=1, le=1000),
+):
+    logger.info(f"🔬 CPU PROFILE STARTED ({seconds}s)")
+    try:
+        return sample_stacks(seconds, interval_ms / 1000)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@app.get("/admin/profile/memory", dependencies=[Depends(require_admin)])
+def profile_memory(
+    seconds: float = Query(10, gt=0, le=60),
+    top: int = Query(25, ge=1, le=500),
+):
+    logger.info(f"🔬 MEMORY PROFILE STARTED ({seconds}s)")
+    try:
+        return {"top_allocations": snapshot_allocations(seconds, top)}
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
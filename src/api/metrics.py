@@ -0,0 +1,189 @@
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# OPTIONAL TRACING (OpenTelemetry is not a hard dependency of the API image)
+try:
+    from opentelemetry import trace
+
+    tracer = (
+        trace.get_tracer("api_service")
+        if os.getenv("PREDICT_TRACING", "false").lower() == "true"
+        else None
+    )
+except ImportError:
+    tracer = None
+
+# Sub-millisecond buckets: most stages finish well below the default 5ms bucket.
+STAGE_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+)
+
+PREDICT_STAGES = (
+    "cache_key",
+    "cache_get",
+    "nearby_get",
+    "features",
+    "inference",
+    "cache_set",
+    "encode",
+)
+
+PREDICT_STAGE_LATENCY = Histogram(
+    "predict_stage_seconds",
+    "Latency of each stage inside /predict",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    "predict_cache_requests_total",
+    "Redis cache lookups done by /predict",
+    ["result"],
+)
+NEARBY_REQUESTS = Counter(
+    "predict_nearby_requests_total",
+    "Exact-cache misses looked up in the nearby-trip index",
+    ["result"],
+)
+MODEL_ERRORS = Counter(
+    "predict_model_errors_total",
+    "Exceptions raised by the ONNX inference session",
+)
+COALESCED_REQUESTS = Counter(
+    "predict_coalesced_requests_total",
+    "Cache misses answered by another in-flight inference for the same key",
+)
+
+# SHADOW / CANARY
+SHADOW_INFERENCE_LATENCY = Histogram(
+    "shadow_inference_seconds",
+    "ONNX inference latency of sampled requests, per model",
+    ["model"],
+    buckets=STAGE_BUCKETS,
+)
+SHADOW_PREDICTION_DELTA = Histogram(
+    "shadow_prediction_delta_seconds",
+    "Absolute difference between candidate and primary predictions",
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1800),
+)
+SHADOW_REQUESTS = Counter(
+    "shadow_requests_total",
+    "Requests sampled for shadow scoring",
+    ["result"],
+)
+MODEL_PREDICTIONS = Counter(
+    "model_predictions_total",
+    "Predictions served to clients, per model",
+    ["model"],
+)
+
+# DRIFT
+DRIFT_PSI = Gauge(
+    "drift_psi",
+    "Population Stability Index of live traffic vs the training reference",
+    ["feature"],
+)
+DRIFT_OBSERVATIONS = Counter(
+    "drift_observations_total",
+    "Predictions folded into the drift sketches",
+)
+
+# ADMISSION CONTROL
+ADMISSION_LIMIT = Gauge(
+    "admission_concurrency_limit",
+    "Current adaptive limit on concurrent cache-miss predictions",
+)
+SHED_REQUESTS = Counter(
+    "predict_shed_requests_total",
+    "Cache misses turned away by admission control",
+    ["action"],
+)
+
+# SATURATION (autoscaling signals; see k8s/monitoring/prometheus-adapter-values.yaml)
+# Inference utilization and cache hit ratio are derived from predict_stage_seconds_sum
+# and predict_cache_requests_total by the adapter rules.
+QUEUE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+PREDICT_IN_FLIGHT = Gauge(
+    "predict_in_flight_requests",
+    "Prediction requests inside the pod, queued or running",
+)
+QUEUE_WAIT = Histogram(
+    "predict_queue_wait_seconds",
+    "Time from request arrival until a worker thread starts the handler",
+    buckets=QUEUE_BUCKETS,
+)
+
+# Label children are resolved once so the hot path skips the label lookup.
+_STAGE_HISTOGRAMS = {
+    stage: PREDICT_STAGE_LATENCY.labels(stage) for stage in PREDICT_STAGES
+}
+CACHE_HIT = CACHE_REQUESTS.labels("hit")
+CACHE_MISS = CACHE_REQUESTS.labels("miss")
+NEARBY_HIT = NEARBY_REQUESTS.labels("hit")
+NEARBY_MISS = NEARBY_REQUESTS.labels("miss")
+SHED_REJECTED = SHED_REQUESTS.labels("rejected")
+SHED_DEGRADED = SHED_REQUESTS.labels("degraded")
+
+
+@contextmanager
+def track_stage(stage: str):
+    """Times a /predict stage into its histogram (and a span if tracing is on)."""
+    histogram = _STAGE_HISTOGRAMS[stage]
+    if tracer is None:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            histogram.observe(time.perf_counter() - start)
+        return
+
+    with tracer.start_as_current_span(f"predict.{stage}"):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            histogram.observe(time.perf_counter() - start)
+
+
+class SaturationMiddleware:
+    """
+    ASGI middleware for /predict*: counts requests in flight (including those still
+    waiting for a threadpool worker) and stamps their arrival for observe_queue_wait.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith("/predict"):
+            await self.app(scope, receive, send)
+            return
+
+        scope.setdefault("state", {})["received_at"] = time.perf_counter()
+        PREDICT_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            PREDICT_IN_FLIGHT.dec()
+
+
+def observe_queue_wait(request):
+    """Call first thing in a sync handler: arrival -> worker thread start."""
+    received_at = getattr(request.state, "received_at", None)
+    if received_at is not None:
+        QUEUE_WAIT.observe(time.perf_counter() - received_at)
@@ -0,0 +1,52 @@
+import threading
+from collections import OrderedDict
+
+import onnxruntime as rt
+
+from src.api.coalescing import SingleFlight
+from src.api.inference import ModelHandle
+from src.components.model_registry import ModelRegistry
+
+
+class ModelPool:
+    """
+    Registry versions for requests that pin a model_version.
+
+    A version is loaded on its first request (concurrent first requests share one
+    load) and kept in an LRU of `max_loaded` sessions, so later pinned requests pay no
+    reload cost. Unknown versions raise KeyError.
+    """
+
+    def __init__(self, registry: ModelRegistry, max_loaded: int = 3):
+        if max_loaded < 1:
+            raise ValueError("max_loaded must be at least 1")
+        self.registry = registry
+        self.max_loaded = max_loaded
+        self._handles = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading = SingleFlight()
+
+    def __contains__(self, version: str):
+        return version in self._handles
+
+    def get(self, version: str) -> ModelHandle:
+        with self._lock:
+            handle = self._handles.get(version)
+            if handle is not None:
+                self._handles.move_to_end(version)
+                return handle
+
+        handle, _ = self._loading.do(version, lambda: self._load(version))
+        return handle
+
+    def _load(self, version: str) -> ModelHandle:
+        session = rt.InferenceSession(self.registry.load_bytes(version))
+        handle = ModelHandle(
+            session, f"{self.registry.root}/{version}", version=version
+        )
+        with self._lock:
+            self._handles[version] = handle
+            self._handles.move_to_end(version)
+            while len(self._handles) > self.max_loaded:
+                self._handles.popitem(last=False)
+        return handle
@@ -0,0 +1,118 @@
+import math
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+import pandas as pd
+
+from src.api.schemas import TaxiInput
+
+# Local flat projection: fine for city-sized distances at NYC's latitude
+METERS_PER_DEGREE = 111_320.0
+METERS_PER_DEGREE_LON = METERS_PER_DEGREE * math.cos(math.radians(40.75))
+
+
+def trip_slot(data: TaxiInput):
+    """(day_of_week, hour) of the pickup, Monday = 0 like the training features."""
+    try:
+        pickup = datetime.fromisoformat(data.pickup_datetime)
+    except ValueError:
+        pickup = pd.Timestamp(data.pickup_datetime)
+    return pickup.weekday(), pickup.hour
+
+
+def project(latitude: float, longitude: float):
+    """Coordinates in metres on the local flat projection."""
+    return longitude * METERS_PER_DEGREE_LON, latitude * METERS_PER_DEGREE
+
+
+class NearbyCache:
+    """
+    In-memory index of recent predictions for approximate reuse.
+
+    A trip is answered with the prediction of a stored trip from the same day of week
+    and hour whose pickup and dropoff each lie within `tolerance_m` metres (the closest
+    one if several do). Trips sit in grid buckets keyed on (day_of_week, hour, pickup
+    cell) with cells `tolerance_m` wide, so a lookup scans the 3x3 cells around the pickup.
+
+    Memory and lookup cost are bounded: at most `max_entries` trips are kept, evicting
+    the least recently used, and a bucket holds at most `bucket_size` trips (its oldest
+    one makes room).
+    """
+
+    def __init__(
+        self, tolerance_m: float = 150, max_entries: int = 50_000, bucket_size: int = 32
+    ):
+        if tolerance_m <= 0:
+            raise ValueError("tolerance_m must be positive")
+        if max_entries < 1 or bucket_size < 1:
+            raise ValueError("max_entries and bucket_size must be at least 1")
+        self.tolerance_m = tolerance_m
+        self.max_entries = max_entries
+        self.bucket_size = bucket_size
+        self._entries = OrderedDict()  # id -> bucket key, LRU first
+        self._buckets = {}  # bucket key -> {id: (px, py, dx, dy, seconds, quantiles)}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _cell(self, x: float, y: float):
+        return math.floor(x / self.tolerance_m), math.floor(y / self.tolerance_m)
+
+    def get(self, data: TaxiInput):
+        """(pred_seconds, quantiles) of the nearest stored trip, or None."""
+        day, hour = trip_slot(data)
+        px, py = project(data.pickup_latitude, data.pickup_longitude)
+        dx, dy = project(data.dropoff_latitude, data.dropoff_longitude)
+        cx, cy = self._cell(px, py)
+        tolerance_sq = self.tolerance_m**2
+
+        best, best_distance = None, math.inf
+        with self._lock:
+            for i in (cx - 1, cx, cx + 1):
+                for j in (cy - 1, cy, cy + 1):
+                    bucket = self._buckets.get((day, hour, i, j))
+                    if not bucket:
+                        continue
+                    for entry_id, (epx, epy, edx, edy, *_) in bucket.items():
+                        pickup_sq = (epx - px) ** 2 + (epy - py) ** 2
+                        dropoff_sq = (edx - dx) ** 2 + (edy - dy) ** 2
+                        if pickup_sq > tolerance_sq or dropoff_sq > tolerance_sq:
+                            continue
+                        distance = math.sqrt(pickup_sq) + math.sqrt(dropoff_sq)
+                        if distance < best_distance:
+                            best, best_distance = (entry_id, bucket), distance
+
+            if best is None:
+                return None
+            entry_id, bucket = best
+            self._entries.move_to_end(entry_id)
+            return bucket[entry_id][4:]
+
+    def put(self, data: TaxiInput, pred_seconds: float, quantiles=None):
+        day, hour = trip_slot(data)
+        px, py = project(data.pickup_latitude, data.pickup_longitude)
+        dx, dy = project(data.dropoff_latitude, data.dropoff_longitude)
+        key = (day, hour, *self._cell(px, py))
+        entry = (px, py, dx, dy, float(pred_seconds), quantiles)
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket and len(bucket) >= self.bucket_size:
+                self._evict(next(iter(bucket)))
+            while len(self._entries) >= self.max_entries:
+                self._evict(next(iter(self._entries)))
+
+            entry_id = self._next_id
+            self._next_id += 1
+            self._buckets.setdefault(key, {})[entry_id] = entry
+            self._entries[entry_id] = key
+
+    def _evict(self, entry_id: int):
+        key = self._entries.pop(entry_id)
+        bucket = self._buckets[key]
+        del bucket[entry_id]
+        if not bucket:
+            del self._buckets[key]
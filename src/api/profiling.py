@@ -0,0 +1,85 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+# Hard upper bound so a typo cannot pin a worker for minutes.
+MAX_PROFILE_SECONDS = 60
+
+_profile_lock = threading.Lock()
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+def _fold_stack(frame) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def sample_stacks(seconds: float, interval: float = 0.005) -> str:
+    """
+    Samples the Python stacks of every live thread for `seconds` and returns them
+    in the folded format ("thread;outer;inner count") read by flamegraph.pl and speedscope.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise RuntimeError("A profile is already running on this worker")
+
+    try:
+        own_id = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        counts = Counter()
+
+        deadline = time.perf_counter() + min(seconds, MAX_PROFILE_SECONDS)
+        while time.perf_counter() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                thread_name = names.get(thread_id, f"thread-{thread_id}")
+                counts[f"{thread_name};{_fold_stack(frame)}"] += 1
+            time.sleep(interval)
+
+        return "\n".join(f"{stack} {count}" for stack, count in counts.most_common())
+    finally:
+        _profile_lock.release()
+
+
+def snapshot_allocations(seconds: float, top: int = 25) -> list:
+    """
+    Traces allocations for `seconds` and returns the top source lines by
+    memory still allocated at the end of the window.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise RuntimeError("A profile is already running on this worker")
+
+    already_tracing = tracemalloc.is_tracing()
+    try:
+        if not already_tracing:
+            tracemalloc.start()
+        time.sleep(min(seconds, MAX_PROFILE_SECONDS))
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+        _profile_lock.release()
+
+    snapshot = snapshot.filter_traces(
+        (tracemalloc.Filter(False, tracemalloc.__file__),)
+    )
+    return [
+        {
+            "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "size_kb": round(stat.size / 1024, 2),
+            "count": stat.count,
+        }
+        for stat in snapshot.statistics("lineno")[:top]
+    ]
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import math
+import struct
+
+import numpy as np
+
+from src.api.inference import format_response, pickup_epoch
+from src.api.schemas import TaxiInput
+
+# OPTIONAL FAST HASH (blake2b keeps keys 128-bit and stable if xxhash is missing)
+try:
+    from xxhash import xxh3_128_digest as _hash128
+except ImportError:  # pragma: no cover
+
+    def _hash128(data: bytes) -> bytes:
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+
+ENCODINGS = ("json", "compact")
+
+# Pickup cells of 0.01° (~1.1 km x 0.85 km in NYC) used to group compact keys into hashes
+CELL_DEGREES = 0.01
+_CELL = struct.Struct("<hh")
+CELL_BYTES = _CELL.size
+HASH_PREFIX = b"c:"
+DIGEST_BYTES = 16
+
+# The five numeric TaxiInput fields and the pickup as epoch seconds (inference.pickup_epoch),
+# so every spelling of the same instant shares one key
+_KEY_FIELDS = struct.Struct("<4dqq")
+
+
+def cell_id(latitude: float, longitude: float) -> bytes:
+    return _CELL.pack(
+        math.floor(latitude / CELL_DEGREES), math.floor(longitude / CELL_DEGREES)
+    )
+
+
+def trip_digest(data: TaxiInput) -> bytes:
+    """128-bit xxh3 of the TaxiInput fields packed into a fixed struct (no JSON round trip)."""
+    return _hash128(
+        _KEY_FIELDS.pack(
+            data.pickup_longitude,
+            data.pickup_latitude,
+            data.dropoff_longitude,
+            data.dropoff_latitude,
+            data.passenger_count,
+            pickup_epoch(data.pickup_datetime),
+        )
+    )
+
+
+def legacy_digest(data: TaxiInput):
+    """The MD5-of-JSON digest the pre-versioned cache keyed its entries by (as hex)."""
+    return hashlib.md5(json.dumps(data.model_dump(), sort_keys=True).encode())
+
+
+def encode_value(pred_seconds, quantiles) -> bytes:
+    """float32 seconds (4 bytes), followed by the quantile seconds if the model has them."""
+    values = [pred_seconds] if quantiles is None else [pred_seconds, *quantiles]
+    return np.asarray(values, dtype="<f4").tobytes()
+
+
+def decode_value(raw: bytes) -> str:
+    """Rebuilds the JSON response body (minutes are derived from seconds)."""
+    values = np.frombuffer(raw, dtype="<f4")
+    quantiles = values[1:] if len(values) > 1 else None
+    return json.dumps(format_response(float(values[0]), quantiles))
+
+
+class ResponseCache:
+    """
+    Prediction cache on top of a bytes-mode Redis client.
+
+    encoding="json": the full response body under a "<model_version>:<hex digest>" key.
+    encoding="compact": float32 seconds under model_version bytes + a 16-byte digest. With
+    group_by_cell, keys also carry their 4-byte pickup cell and live as fields of Redis
+    hashes, one per (version, cell, digest bucket). Hashes below hash-max-listpack-entries
+    (128 by default) are stored as listpacks, so the per-key overhead mostly disappears.
+    Redis < 7.4 has no per-field TTL, so in this layout:
+    - a hash expires `ttl` seconds after its FIRST write (EXPIRE NX): a busy cell is
+      dropped and refilled on schedule, and a field lives anywhere up to `ttl`;
+    - a hash holds at most `max_fields` fields: once full, further answers for it are
+      not cached until it expires. Size `cell_buckets` so that cached trips per cell /
+      cell_buckets stays under `max_fields`.
+
+    The model version prefix keeps a new model from serving its predecessor's answers.
+    With read_legacy, a miss also tries the entry the pre-versioned cache wrote (a hex
+    MD5 key holding the JSON body) and copies a hit under the new key in this cache's
+    encoding, so a rollout starts from a warm cache.
+    """
+
+    def __init__(
+        self,
+        client,
+        encoding: str = "json",
+        group_by_cell=False,
+        cell_buckets: int = 64,
+        max_fields: int = 128,
+        ttl: int = 3600,
+        model_version: str = "",
+        read_legacy=False,
+    ):
+        if encoding not in ENCODINGS:
+            raise ValueError(
+                f"Unknown cache encoding {encoding!r}, expected {ENCODINGS}"
+            )
+        if not 1 <= cell_buckets <= 256:
+            raise ValueError("cell_buckets must be between 1 and 256")
+        self.client = client
+        self.compact = encoding == "compact"
+        self.group_by_cell = self.compact and group_by_cell
+        self.cell_buckets = cell_buckets
+        self.max_fields = max_fields
+        self.ttl = ttl
+        self.model_version = model_version
+        self.version_prefix = bytes.fromhex(model_version)
+        self.read_legacy = read_legacy
+
+    def _layout(self, data: TaxiInput, prefix, digest):
+        if not self.compact:
+            return f"{prefix.hex()}:{digest.hex()}" if prefix else digest.hex()
+        if self.group_by_cell:
+            prefix += cell_id(data.pickup_latitude, data.pickup_longitude)
+        return prefix + digest
+
+    def key(self, data: TaxiInput, version: str = None):
+        """Key under the serving model's version, or under a caller-pinned `version`."""
+        prefix = self.version_prefix if version is None else bytes.fromhex(version)
+        return self._layout(data, prefix, trip_digest(data))
+
+    @staticmethod
+    def legacy_key(data: TaxiInput) -> str:
+        return legacy_digest(data).hexdigest()
+
+    def _split(self, key: bytes):
+        """(hash name, field) for a grouped key: the digest is always the last 16 bytes."""
+        prefix, digest = key[:-DIGEST_BYTES], key[-DIGEST_BYTES:]
+        bucket = digest[0] % self.cell_buckets
+        return HASH_PREFIX + prefix + bytes([bucket]), digest
+
+    def get_raw(self, key):
+        """The stored value as-is (None on a miss)."""
+        if self.group_by_cell:
+            return self.client.hget(*self._split(key))
+        return self.client.get(key)
+
+    def get(self, key, data: TaxiInput = None):
+        """The JSON response body for `key`, or None on a miss."""
+        raw = self.get_raw(key)
+        if raw is None and self.read_legacy and data is not None:
+            return self._migrate_legacy(key, data)
+        if raw is None or not self.compact:
+            return raw
+        return decode_value(raw)
+
+    def _migrate_legacy(self, key, data: TaxiInput):
+        """The pre-versioned entry's JSON body, copied under `key` (None on a miss)."""
+        body = self.client.get(self.legacy_key(data))
+        if body is None:
+            return None
+        if self.compact:
+            seconds = json.loads(body)["predicted_duration_seconds"]
+            self.set_raw(key, encode_value(seconds, None))
+        else:
+            self.set_raw(key, body)
+        return body
+
+    def set(self, key, pred_seconds, quantiles, body: str):
+        if self.compact:
+            self.set_raw(key, encode_value(pred_seconds, quantiles))
+        else:
+            self.set_raw(key, body)
+
+    def set_raw(self, key, value):
+        if self.group_by_cell:
+            name, field = self._split(key)
+            pipe = self.client.pipeline(transaction=False)
+            pipe.hset(name, field, value)
+            pipe.expire(name, self.ttl, nx=True)
+            pipe.hlen(name)
+            *_, n_fields = pipe.execute()
+            if n_fields > self.max_fields:
+                self.client.hdel(name, field)
+        else:
+            self.client.setex(key, self.ttl, value)
@@ -1,6 +1,9 @@
 from datetime import datetime
+from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+MAX_BATCH_TRIPS = 2000
 
 
 # DATA COMING FROM THE USER
@@ -28,3 +31,16 @@ class TaxiInput(BaseModel):
 class PredictionOutput(BaseModel):
     predicted_duration_seconds: float
     predicted_duration_minutes: float
+    # Only present when the model was exported with per-tree quantiles
+    predicted_duration_p10_seconds: Optional[float] = None
+    predicted_duration_p90_seconds: Optional[float] = None
+
+
+# BATCH (what-if grids): one model run for the whole list, columnar output
+class BatchInput(BaseModel):
+    trips: List[TaxiInput] = Field(..., min_length=1, max_length=MAX_BATCH_TRIPS)
+
+
+class BatchOutput(BaseModel):
+    predicted_duration_seconds: List[float]
+    predicted_duration_minutes: List[float]
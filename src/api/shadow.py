@@ -0,0 +1,73 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.api.inference import ModelHandle
+from src.api.metrics import (
+    SHADOW_INFERENCE_LATENCY,
+    SHADOW_PREDICTION_DELTA,
+    SHADOW_REQUESTS,
+)
+from src.api.schemas import TaxiInput
+from src.utils.logger import get_logger
+
+logger = get_logger("api_service")
+
+
+class ShadowScorer:
+    """
+    Compares a candidate model against the live one on real traffic.
+    - Shadow: a `sample_rate` share of primary predictions is re-scored by the candidate
+      on a background thread; the request never waits for it and, when `max_pending`
+      jobs are queued, extra samples are dropped instead of queued.
+    - Canary: a `canary_weight` share of requests is answered by the candidate instead.
+    """
+
+    def __init__(
+        self,
+        candidate: ModelHandle,
+        sample_rate: float = 0.0,
+        canary_weight: float = 0.0,
+        max_pending: int = 64,
+    ):
+        self.candidate = candidate
+        self.sample_rate = sample_rate
+        self.canary_weight = canary_weight
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+
+    def route_canary(self) -> bool:
+        return self.canary_weight > 0 and random.random() < self.canary_weight
+
+    def submit(self, data: TaxiInput, primary_seconds: float, primary_latency: float):
+        """Samples and enqueues a comparison; returns immediately in every case."""
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return
+        if not self._slots.acquire(blocking=False):
+            SHADOW_REQUESTS.labels("dropped").inc()
+            return
+        try:
+            self._executor.submit(self._score, data, primary_seconds, primary_latency)
+        except RuntimeError:
+            # Executor already shut down
+            self._slots.release()
+
+    def _score(self, data: TaxiInput, primary_seconds: float, primary_latency: float):
+        try:
+            start = time.perf_counter()
+            candidate_seconds, _ = self.candidate.predict(data)
+            candidate_latency = time.perf_counter() - start
+
+            SHADOW_INFERENCE_LATENCY.labels("primary").observe(primary_latency)
+            SHADOW_INFERENCE_LATENCY.labels("candidate").observe(candidate_latency)
+            SHADOW_PREDICTION_DELTA.observe(abs(candidate_seconds - primary_seconds))
+            SHADOW_REQUESTS.labels("scored").inc()
+        except Exception as e:
+            SHADOW_REQUESTS.labels("error").inc()
+            logger.warning(f"⚠️ SHADOW SCORING FAILED: {e}")
+        finally:
+            self._slots.release()
+
+    def close(self, wait: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
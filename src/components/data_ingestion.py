@@ -1,65 +1,59 @@
 import os
-import zipfile
 
-import gdown
+import numpy as np
 import pandas as pd
 
-from src.config import NYC_BOUNDS
+from src.config import (
+    MAX_SPEED_KPH,
+    MAX_TRIP_DURATION,
+    MIN_SPEED_KPH,
+    MIN_TRIP_DURATION,
+    NYC_BOUNDS,
+)
+from src.utils.data_fetch import fetch_dataset
+from src.utils.geo_utils import haversine_array
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 # --- GOOGLE DRIVE SETTINGS ---
 DRIVE_FILE_ID = "1bC2VJsYYQdDOUKMdu4W6YPP0NPgQqBbc"
+# sha256 of train.csv inside that archive (DATA_SHA256 overrides it for a new upload).
+# Unset until recorded from a verified copy: each fetch logs the digest to pin here.
+DRIVE_FILE_SHA256 = None
 
 
 def check_and_download_data(filepath: str):
     """
-    If the file doesn't exist at the given file path, it downloads it from Google Drive and extracts it from the zip file.
+    If the file doesn't exist (or fails verification) at the given file path, it fetches it
+    from the DATA_CACHE_DIR mirror or Google Drive and stream-extracts it from the zip file.
     It also automatically creates subfolders such as 'data/raw'.
     """
-    if os.path.exists(filepath):
-        logger.info(f"✅ DATA FOUND AT: {filepath}")
-        return
-
-    logger.info(
-        f"⬇️ DATA NOT FOUND. DOWNLOADING FROM GOOGLE DRIVE (ID: {DRIVE_FILE_ID})..."
-    )
-
-    directory = os.path.dirname(filepath)
-    if not os.path.exists(directory):
-        os.makedirs(directory)
-        logger.info(f"📁 Created directory: {directory}")
-
-    zip_path = os.path.join(directory, "temp_data.zip")
-    url = f"https://drive.google.com/uc?id={DRIVE_FILE_ID}"
-
     try:
-        # 1. DOWNLOAD
-        gdown.download(url, zip_path, quiet=False)
-
-        # 2. EXTRACTING
-        if os.path.exists(zip_path):
-            logger.info("📦 EXTRACTING ZIP FILE...")
-            with zipfile.ZipFile(zip_path, "r") as zip_ref:
-                zip_ref.extractall(directory)
-
-            # 3. CLEANING
-            os.remove(zip_path)
-            logger.info(
-                f"✅ DOWNLOAD & EXTRACTION COMPLETE. File is ready at: {filepath}"
-            )
-        else:
-            raise FileNotFoundError("Downloaded zip file could not be found.")
-
+        fetch_dataset(
+            filepath,
+            DRIVE_FILE_ID,
+            cache_dir=os.getenv("DATA_CACHE_DIR"),
+            expected_sha256=os.getenv("DATA_SHA256", DRIVE_FILE_SHA256),
+        )
     except Exception as e:
         logger.error(f"❌ DOWNLOAD FAILED: {e}")
-        if os.path.exists(zip_path):
-            os.remove(zip_path)
         raise e
 
 
-def load_and_clean_data(filepath: str) -> pd.DataFrame:
+# Columns the training pipeline actually reads from the raw CSV
+TRAINING_COLUMNS = [
+    "pickup_datetime",
+    "passenger_count",
+    "pickup_longitude",
+    "pickup_latitude",
+    "dropoff_longitude",
+    "dropoff_latitude",
+    "trip_duration",
+]
+
+
+def load_raw_data(filepath: str, usecols=None) -> pd.DataFrame:
     check_and_download_data(filepath)
 
     logger.info(f"LOADING DATA FROM: {filepath}")
@@ -68,26 +62,65 @@ def load_and_clean_data(filepath: str) -> pd.DataFrame:
         logger.error(f"FILE {filepath} DOES NOT EXIST")
         raise FileNotFoundError(f"FILE COULD NOT FIND: {filepath}")
 
-    df = pd.read_csv(filepath)
+    return pd.read_csv(filepath, usecols=usecols)
+
+
+def _within(values: np.ndarray, low: float, high: float) -> np.ndarray:
+    return (values >= low) & (values <= high)
+
+
+def clean_trips(df: pd.DataFrame):
+    """
+    Applies every row-validity rule (duration, NYC_BOUNDS, average speed) as one boolean mask
+    built from the raw numpy columns, then selects the surviving rows with a single take.
+    Returns the cleaned frame and the number of rows each rule rejects on its own.
+    """
+    duration = df["trip_duration"].to_numpy(dtype=np.float64)
+    pickup_lat = df["pickup_latitude"].to_numpy(dtype=np.float64)
+    pickup_lng = df["pickup_longitude"].to_numpy(dtype=np.float64)
+    dropoff_lat = df["dropoff_latitude"].to_numpy(dtype=np.float64)
+    dropoff_lng = df["dropoff_longitude"].to_numpy(dtype=np.float64)
+
+    # 1. RULE: TIME
+    duration_ok = _within(duration, MIN_TRIP_DURATION, MAX_TRIP_DURATION)
+
+    # 2. RULE: COORDINATE BOUNDARIES
+    bounds_ok = (
+        _within(pickup_lng, NYC_BOUNDS["min_lng"], NYC_BOUNDS["max_lng"])
+        & _within(pickup_lat, NYC_BOUNDS["min_lat"], NYC_BOUNDS["max_lat"])
+        & _within(dropoff_lng, NYC_BOUNDS["min_lng"], NYC_BOUNDS["max_lng"])
+        & _within(dropoff_lat, NYC_BOUNDS["min_lat"], NYC_BOUNDS["max_lat"])
+    )
+
+    # 3. RULE: VELOCITY
+    with np.errstate(divide="ignore", invalid="ignore"):
+        speed_kph = (
+            haversine_array(pickup_lat, pickup_lng, dropoff_lat, dropoff_lng)
+            / duration
+            * 3600
+        )
+    speed_ok = _within(speed_kph, MIN_SPEED_KPH, MAX_SPEED_KPH)
+
+    mask = duration_ok & bounds_ok & speed_ok
+
+    drop_counts = {
+        "dropped_duration": int(len(mask) - np.count_nonzero(duration_ok)),
+        "dropped_bounds": int(len(mask) - np.count_nonzero(bounds_ok)),
+        "dropped_speed": int(len(mask) - np.count_nonzero(speed_ok)),
+        "dropped_total": int(len(mask) - np.count_nonzero(mask)),
+    }
+
+    return df.take(np.flatnonzero(mask)), drop_counts
+
+
+def load_and_clean_data(filepath: str) -> pd.DataFrame:
+    df = load_raw_data(filepath)
     original_len = len(df)
 
-    # 1. CLEANING: TIME
-    df = df[(df["trip_duration"] >= 60) & (df["trip_duration"] <= 10800)]
-
-    # 2. CLEANING: COORDINATE BOUNDARIES
-    df = df[
-        (df["pickup_longitude"] >= NYC_BOUNDS["min_lng"])
-        & (df["pickup_longitude"] <= NYC_BOUNDS["max_lng"])
-        & (df["pickup_latitude"] >= NYC_BOUNDS["min_lat"])
-        & (df["pickup_latitude"] <= NYC_BOUNDS["max_lat"])
-        & (df["dropoff_longitude"] >= NYC_BOUNDS["min_lng"])
-        & (df["dropoff_longitude"] <= NYC_BOUNDS["max_lng"])
-        & (df["dropoff_latitude"] >= NYC_BOUNDS["min_lat"])
-        & (df["dropoff_latitude"] <= NYC_BOUNDS["max_lat"])
-    ]
+    df, drop_counts = clean_trips(df)
 
     logger.info(
-        f"THE CLEANUP IS COMPLETE. THE REMAINING LINES ARE {original_len} -> {len(df)}"
+        f"THE CLEANUP IS COMPLETE. THE REMAINING LINES ARE {original_len} -> {len(df)} {drop_counts}"
     )
     return df
 
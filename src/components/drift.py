@@ -0,0 +1,56 @@
+import json
+import os
+
+import numpy as np
+
+DRIFT_BINS = 10
+PSI_EPSILON = 1e-4
+
+
+def make_edges(values, bins: int = DRIFT_BINS) -> np.ndarray:
+    """Inner quantile cut points; repeated cuts (discrete features) collapse into one."""
+    quantiles = np.linspace(0, 1, bins + 1)[1:-1]
+    return np.unique(np.quantile(np.asarray(values, dtype=np.float64), quantiles))
+
+
+def bin_counts(values, edges) -> np.ndarray:
+    """Histogram over len(edges) + 1 bins with open-ended first/last bins."""
+    idx = np.searchsorted(edges, np.asarray(values, dtype=np.float64), side="right")
+    return np.bincount(idx, minlength=len(edges) + 1).astype(np.float64)
+
+
+def psi(reference, live) -> float:
+    """Population Stability Index between two histograms (0 = identical, > 0.25 = major shift)."""
+    ref = np.maximum(np.asarray(reference) / np.sum(reference), PSI_EPSILON)
+    cur = np.asarray(live, dtype=np.float64)
+    total = cur.sum()
+    if total == 0:
+        return 0.0
+    cur = np.maximum(cur / total, PSI_EPSILON)
+    return float(np.sum((cur - ref) * np.log(cur / ref)))
+
+
+def build_reference(columns: dict) -> dict:
+    """columns: name -> 1-D values. Returns {name: {"edges": [...], "proportions": [...]}}."""
+    reference = {}
+    for name, values in columns.items():
+        edges = make_edges(values)
+        counts = bin_counts(values, edges)
+        reference[name] = {
+            "edges": edges.tolist(),
+            "proportions": (counts / counts.sum()).tolist(),
+        }
+    return reference
+
+
+def save_reference(reference: dict, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(reference, f)
+    os.replace(tmp_path, path)
+
+
+def load_reference(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
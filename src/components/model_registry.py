@@ -0,0 +1,209 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import uuid
+
+import numpy as np
+import onnxruntime as rt
+
+from src.config import FEATURES, RAW_INPUTS
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Version ids are the first 8 hex chars of the model's sha256: the same prefix the API
+# puts on cache keys, so a version and its cached answers share one id.
+VERSION_CHARS = 8
+VERSION_PATTERN = f"^[0-9a-f]{{{VERSION_CHARS}}}$"
+MODEL_FILENAME = "model.onnx"
+MANIFEST_FILENAME = "manifest.json"
+CURRENT_FILENAME = "CURRENT"
+
+
+def content_version(model_bytes: bytes) -> str:
+    return hashlib.sha256(model_bytes).hexdigest()[:VERSION_CHARS]
+
+
+def _write_synced(path: str, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def model_opsets(onnx_model) -> dict:
+    """{domain: opset version} of a ModelProto ("ai.onnx" for the default domain)."""
+    return {
+        opset.domain or "ai.onnx": opset.version for opset in onnx_model.opset_import
+    }
+
+
+def benchmark_latency(model_bytes: bytes, X: np.ndarray, runs: int = 200) -> dict:
+    """
+    CPU latency of the serialized model on rows of the training feature matrix:
+    single-row p50/p99 (what /predict pays) and one 1000-row batch.
+    """
+    session = rt.InferenceSession(model_bytes)
+    names = [i.name for i in session.get_inputs()]
+    X = np.ascontiguousarray(X[:1000], dtype=np.float32)
+
+    def feed(rows):
+        # Fused graphs take the raw fields, which are the first FEATURES columns
+        if names == RAW_INPUTS:
+            return {name: rows[:, [FEATURES.index(name)]] for name in RAW_INPUTS}
+        return {names[0]: rows}
+
+    single = feed(X[:1])
+    for _ in range(20):
+        session.run(None, single)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        session.run(None, single)
+        timings.append(time.perf_counter() - start)
+
+    batch = feed(X)
+    start = time.perf_counter()
+    session.run(None, batch)
+    batch_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "single_row_p50_ms": round(float(np.percentile(timings, 50)) * 1000, 4),
+        "single_row_p99_ms": round(float(np.percentile(timings, 99)) * 1000, 4),
+        f"batch_{len(X)}_ms": round(batch_ms, 3),
+    }
+
+
+class ModelRegistry:
+    """
+    Content-addressed store of ONNX models under `root`:
+
+        <root>/<version>/model.onnx
+        <root>/<version>/manifest.json   (features, opsets, benchmark, sha256, ...)
+        <root>/CURRENT                   (the version the API serves by default)
+
+    A version directory is written under a temporary name and renamed into place, so
+    readers either see a complete version or none. Publishing the same bytes again is
+    a no-op that returns the existing version. load_bytes() checks the sha256 recorded
+    in the manifest, so a damaged file is refused instead of half-loaded.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, version: str, filename: str) -> str:
+        # Versions also arrive from API callers: never let one leave the registry
+        if not re.fullmatch(VERSION_PATTERN, version):
+            raise KeyError(version)
+        return os.path.join(self.root, version, filename)
+
+    def publish(self, model_bytes: bytes, manifest: dict, activate=True) -> str:
+        sha256 = hashlib.sha256(model_bytes).hexdigest()
+        version = sha256[:VERSION_CHARS]
+        final_dir = os.path.join(self.root, version)
+
+        if not os.path.isdir(final_dir):
+            os.makedirs(self.root, exist_ok=True)
+            tmp_dir = os.path.join(self.root, f".tmp-{version}-{uuid.uuid4().hex}")
+            os.makedirs(tmp_dir)
+            manifest = {
+                **manifest,
+                "version": version,
+                "sha256": sha256,
+                "size_bytes": len(model_bytes),
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            }
+            _write_synced(os.path.join(tmp_dir, MODEL_FILENAME), model_bytes)
+            _write_synced(
+                os.path.join(tmp_dir, MANIFEST_FILENAME),
+                json.dumps(manifest, indent=2, sort_keys=True).encode(),
+            )
+            try:
+                os.rename(tmp_dir, final_dir)
+                logger.info(f"📦 PUBLISHED MODEL VERSION {version}")
+            except OSError:
+                # Another publisher renamed the same content first
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        if activate:
+            self.activate(version)
+        return version
+
+    def activate(self, version: str):
+        if not os.path.isfile(self._path(version, MANIFEST_FILENAME)):
+            raise KeyError(version)
+        tmp_path = os.path.join(self.root, f"{CURRENT_FILENAME}.tmp")
+        _write_synced(tmp_path, version.encode())
+        os.replace(tmp_path, os.path.join(self.root, CURRENT_FILENAME))
+
+    def current(self):
+        """The active version, or None if nothing was published."""
+        try:
+            with open(os.path.join(self.root, CURRENT_FILENAME)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def versions(self) -> list:
+        """Published versions, oldest first."""
+        if not os.path.isdir(self.root):
+            return []
+        published = {
+            name: os.stat(self._path(name, MANIFEST_FILENAME)).st_mtime_ns
+            for name in os.listdir(self.root)
+            if re.fullmatch(VERSION_PATTERN, name)
+            and os.path.isfile(self._path(name, MANIFEST_FILENAME))
+        }
+        # created_at has one-second resolution: the manifest's mtime breaks ties
+        return sorted(
+            published, key=lambda v: (self.manifest(v)["created_at"], published[v])
+        )
+
+    def manifest(self, version: str) -> dict:
+        try:
+            with open(self._path(version, MANIFEST_FILENAME)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise KeyError(version) from None
+
+    def prune(self, keep: int, pinned=()) -> list:
+        """
+        Deletes all but the newest `keep` versions, never CURRENT or a `pinned` one, and
+        returns the deleted versions. A version is renamed out of place before it is
+        removed, so readers never see it half-deleted.
+        """
+        if keep < 1:
+            raise ValueError("keep must be at least 1")
+        protected = {self.current(), *pinned}
+        removed = [v for v in self.versions()[:-keep] if v not in protected]
+        for version in removed:
+            doomed = os.path.join(self.root, f".del-{version}-{uuid.uuid4().hex}")
+            os.rename(os.path.join(self.root, version), doomed)
+            shutil.rmtree(doomed, ignore_errors=True)
+        if removed:
+            logger.info(f"🧹 PRUNED MODEL VERSIONS {removed}")
+        return removed
+
+    def load_bytes(self, version: str) -> bytes:
+        manifest = self.manifest(version)
+        with open(self._path(version, MODEL_FILENAME), "rb") as f:
+            model_bytes = f.read()
+        if hashlib.sha256(model_bytes).hexdigest() != manifest["sha256"]:
+            raise ValueError(f"Model version {version} does not match its manifest")
+        return model_bytes
+
+
+def publish_model(registry: ModelRegistry, onnx_model, X_sample, **extra) -> str:
+    """Benchmarks an exported ModelProto and publishes it with its manifest."""
+    model_bytes = onnx_model.SerializeToString()
+    manifest = {
+        "features": FEATURES,
+        "inputs": [i.name for i in onnx_model.graph.input],
+        "opsets": model_opsets(onnx_model),
+        "benchmark": benchmark_latency(model_bytes, X_sample),
+        **extra,
+    }
+    return registry.publish(model_bytes, manifest)
@@ -10,7 +10,15 @@ from sklearn.model_selection import train_test_split
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
 
-from src.config import RANDOM_STATE, TEST_SIZE
+from src.components.onnx_featurizer import build_fused_model
+from src.components.onnx_quantiles import build_quantile_model
+from src.config import (
+    MODEL_EXPORT_MODE,
+    MODEL_EXPORT_QUANTILES,
+    PREDICTION_QUANTILES,
+    RANDOM_STATE,
+    TEST_SIZE,
+)
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -79,3 +87,31 @@ def export_model(pipeline, feature_count, path):
     with open(path, "wb") as f:
         f.write(onnx_model.SerializeToString())
     logger.info("✅ THE MODEL HAS BEEN SUCCESSFULLY SAVED.")
+
+
+def build_onnx_model(model, feature_count):
+    """Converts a fitted regressor and applies the configured export options."""
+    initial_type = [("float_input", FloatTensorType([None, feature_count]))]
+    onnx_model = convert_sklearn(model, initial_types=initial_type)
+
+    if MODEL_EXPORT_QUANTILES:
+        logger.info(f"📊 ADDING TREE QUANTILES {PREDICTION_QUANTILES}...")
+        onnx_model = build_quantile_model(onnx_model, PREDICTION_QUANTILES)
+
+    if MODEL_EXPORT_MODE == "fused":
+        logger.info("🧬 FUSING FEATURE ENGINEERING INTO THE ONNX GRAPH...")
+        onnx_model = build_fused_model(onnx_model)
+
+    return onnx_model
+
+
+def save_onnx_model(onnx_model, path):
+    """Writes to a temp file and renames it, so readers never see a partial model."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(onnx_model.SerializeToString())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
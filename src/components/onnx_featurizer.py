@@ -0,0 +1,136 @@
+import math
+
+import onnx
+from onnx import TensorProto, helper
+
+from src.config import RAW_INPUTS
+from src.utils.onnx_utils import GraphBuilder, merged_opsets
+
+FUSED_OUTPUTS = ["duration_seconds", "duration_minutes"]
+
+AVG_EARTH_RADIUS = 6371  # km, same constant as geo_utils.haversine_array
+
+
+def _radians(g, x):
+    return g.op("Mul", x, g.const(math.pi / 180))
+
+
+def _haversine(g, lat1, lng1, lat2, lng2):
+    half = g.const(0.5)
+    lat1, lng1, lat2, lng2 = (_radians(g, v) for v in (lat1, lng1, lat2, lng2))
+    sin_dlat = g.op("Sin", g.op("Mul", g.op("Sub", lat2, lat1), half))
+    sin_dlng = g.op("Sin", g.op("Mul", g.op("Sub", lng2, lng1), half))
+    d = g.op(
+        "Add",
+        g.op("Mul", sin_dlat, sin_dlat),
+        g.op(
+            "Mul",
+            g.op("Mul", g.op("Cos", lat1), g.op("Cos", lat2)),
+            g.op("Mul", sin_dlng, sin_dlng),
+        ),
+    )
+    return g.op("Mul", g.op("Asin", g.op("Sqrt", d)), g.const(2 * AVG_EARTH_RADIUS))
+
+
+def _atan2(g, y, x):
+    """ONNX has no Atan2: atan(y/x) plus quadrant and x == 0 corrections (matches np.arctan2)."""
+    zero = g.const(0.0)
+    base = g.op("Atan", g.op("Div", y, x))
+    y_non_negative = g.op("GreaterOrEqual", y, zero)
+    shifted = g.op(
+        "Add", base, g.op("Where", y_non_negative, g.const(math.pi), g.const(-math.pi))
+    )
+    result = g.op("Where", g.op("Less", x, zero), shifted, base)
+
+    on_axis = g.op(
+        "Where",
+        g.op("Greater", y, zero),
+        g.const(math.pi / 2),
+        g.op("Where", g.op("Less", y, zero), g.const(-math.pi / 2), zero),
+    )
+    return g.op("Where", g.op("Equal", x, zero), on_axis, result)
+
+
+def _bearing(g, lat1, lng1, lat2, lng2):
+    dlng = _radians(g, g.op("Sub", lng2, lng1))
+    lat1, lat2 = _radians(g, lat1), _radians(g, lat2)
+    cos_lat2 = g.op("Cos", lat2)
+    y = g.op("Mul", g.op("Sin", dlng), cos_lat2)
+    x = g.op(
+        "Sub",
+        g.op("Mul", g.op("Cos", lat1), g.op("Sin", lat2)),
+        g.op("Mul", g.op("Mul", g.op("Sin", lat1), cos_lat2), g.op("Cos", dlng)),
+    )
+    return g.op("Mul", _atan2(g, y, x), g.const(180 / math.pi))
+
+
+def build_fused_model(model: onnx.ModelProto) -> onnx.ModelProto:
+    """
+    Wraps a skl2onnx regressor (single [N, 12] `float_input`, log1p target) into a graph that
+    takes the raw trip fields, computes the create_features columns with ONNX ops and returns
+    expm1 of the prediction as seconds and minutes.
+    """
+    g = GraphBuilder()
+    coords = (
+        "pickup_latitude",
+        "pickup_longitude",
+        "dropoff_latitude",
+        "dropoff_longitude",
+    )
+
+    # FEATURE ENGINEERING (same order as the training feature list)
+    is_weekend = g.op(
+        "Cast",
+        g.op("GreaterOrEqual", "day_of_week", g.const(5.0)),
+        to=TensorProto.FLOAT,
+    )
+    haversine = _haversine(g, *coords)
+    manhattan = g.op("Add", haversine, haversine)
+    bearing = _bearing(g, *coords)
+
+    features = RAW_INPUTS + [
+        is_weekend,
+        haversine,
+        manhattan,
+        bearing,
+    ]
+    model_input = model.graph.input[0].name
+    g.op("Concat", *features, output=model_input, axis=1)
+    n_feature_nodes = len(g.nodes)
+
+    # TARGET: expm1(log prediction)
+    model_output = model.graph.output[0].name
+    seconds = g.op(
+        "Sub", g.op("Exp", model_output), g.const(1.0), output=FUSED_OUTPUTS[0]
+    )
+    g.op("Div", seconds, g.const(60.0), output=FUSED_OUTPUTS[1])
+    outputs = [
+        helper.make_tensor_value_info(name, TensorProto.FLOAT, [None, 1])
+        for name in FUSED_OUTPUTS
+    ]
+
+    # Extra log-scale outputs (e.g. quantiles) are passed through as seconds too.
+    for extra in model.graph.output[1:]:
+        name = f"{extra.name}_seconds"
+        g.op("Sub", g.op("Exp", extra.name), g.const(1.0), output=name)
+        dims = [d.dim_value or None for d in extra.type.tensor_type.shape.dim]
+        outputs.append(helper.make_tensor_value_info(name, TensorProto.FLOAT, dims))
+
+    graph = helper.make_graph(
+        g.nodes[:n_feature_nodes] + list(model.graph.node) + g.nodes[n_feature_nodes:],
+        "nyc_taxi_fused",
+        [
+            helper.make_tensor_value_info(name, TensorProto.FLOAT, [None, 1])
+            for name in RAW_INPUTS
+        ],
+        outputs,
+        initializer=list(model.graph.initializer) + g.initializers,
+    )
+
+    fused = helper.make_model(
+        graph, opset_imports=merged_opsets(model), producer_name="nyc-taxi-mlops"
+    )
+    fused.ir_version = model.ir_version
+    fused.metadata_props.extend(model.metadata_props)
+    onnx.checker.check_model(fused)
+    return fused
@@ -0,0 +1,90 @@
+import math
+
+import numpy as np
+import onnx
+from onnx import TensorProto, helper
+
+from src.utils.onnx_utils import GraphBuilder, merged_opsets
+
+QUANTILES_OUTPUT = "quantiles"
+
+
+def build_quantile_model(model: onnx.ModelProto, quantiles) -> onnx.ModelProto:
+    """
+    Rewrites a skl2onnx random forest so each tree writes to its own target: one
+    TreeEnsembleRegressor call yields all per-tree predictions [N, n_trees]. The mean is
+    kept as the first output (unchanged interface) and the requested quantiles, linearly
+    interpolated like np.quantile, are returned as a second [N, len(quantiles)] output.
+    """
+    ensemble = next(n for n in model.graph.node if n.op_type == "TreeEnsembleRegressor")
+    attrs = {a.name: helper.get_attribute_value(a) for a in ensemble.attribute}
+    if attrs.get("n_targets", 1) != 1:
+        raise ValueError("Quantile export only supports single-target forests")
+
+    # skl2onnx stores leaf / n_trees so the SUM aggregate yields the mean.
+    n_trees = len(set(attrs["nodes_treeids"]))
+    attrs["n_targets"] = n_trees
+    attrs["target_ids"] = list(attrs["target_treeids"])
+    attrs["target_weights"] = [w * n_trees for w in attrs["target_weights"]]
+
+    g = GraphBuilder(prefix="q")
+    per_tree = g.op(
+        "TreeEnsembleRegressor", *ensemble.input, domain="ai.onnx.ml", **attrs
+    )
+    mean_output = model.graph.output[0].name
+    g.op("ReduceMean", per_tree, g.const([1], dtype=np.int64), output=mean_output)
+
+    # QUANTILES: sort the tree outputs, then interpolate between neighbours
+    sorted_trees, _ = g.op(
+        "TopK",
+        per_tree,
+        g.const([n_trees], dtype=np.int64),
+        n_outputs=2,
+        axis=1,
+        largest=0,
+        sorted=1,
+    )
+    positions = [q * (n_trees - 1) for q in quantiles]
+    low = g.op(
+        "Gather",
+        sorted_trees,
+        g.const([math.floor(p) for p in positions], dtype=np.int64),
+        axis=1,
+    )
+    high = g.op(
+        "Gather",
+        sorted_trees,
+        g.const([math.ceil(p) for p in positions], dtype=np.int64),
+        axis=1,
+    )
+    fraction = g.const([p - math.floor(p) for p in positions])
+    g.op(
+        "Add",
+        low,
+        g.op("Mul", g.op("Sub", high, low), fraction),
+        output=QUANTILES_OUTPUT,
+    )
+
+    other_nodes = [n for n in model.graph.node if n is not ensemble]
+    graph = helper.make_graph(
+        other_nodes + g.nodes,
+        model.graph.name,
+        list(model.graph.input),
+        [
+            model.graph.output[0],
+            helper.make_tensor_value_info(
+                QUANTILES_OUTPUT, TensorProto.FLOAT, [None, len(quantiles)]
+            ),
+        ],
+        initializer=list(model.graph.initializer) + g.initializers,
+    )
+
+    quantile_model = helper.make_model(
+        graph, opset_imports=merged_opsets(model), producer_name="nyc-taxi-mlops"
+    )
+    quantile_model.ir_version = model.ir_version
+    helper.set_model_props(
+        quantile_model, {"quantiles": ",".join(str(q) for q in quantiles)}
+    )
+    onnx.checker.check_model(quantile_model)
+    return quantile_model
@@ -0,0 +1,58 @@
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.utils.geo_utils import haversine_array
+
+# Feature columns build_speed_lookup takes (before the durations), in order
+SPEED_LOOKUP_FEATURES = ("hour", "is_weekend", "distance_haversine")
+
+
+def build_speed_lookup(hours, is_weekend, distance_km, duration_seconds) -> dict:
+    """
+    Median trip speed (km/h) per (is_weekend, hour), the fallback estimate the API
+    serves when it sheds load. Empty slots fall back to the overall median.
+    """
+    hours = np.asarray(hours, dtype=np.int64)
+    is_weekend = np.asarray(is_weekend, dtype=np.int64)
+    speed = np.asarray(distance_km) / (np.asarray(duration_seconds) / 3600)
+
+    overall = float(np.median(speed))
+    table = np.full((2, 24), overall)
+    for weekend in (0, 1):
+        for hour in range(24):
+            mask = (is_weekend == weekend) & (hours == hour)
+            if mask.any():
+                table[weekend, hour] = np.median(speed[mask])
+    return {"median_speed_kph": table.tolist(), "overall_speed_kph": overall}
+
+
+def estimate_seconds(lookup: dict, trip) -> float:
+    """Duration of one TaxiInput at its slot's median speed."""
+    pickup = pd.Timestamp(trip.pickup_datetime)
+    distance = haversine_array(
+        trip.pickup_latitude,
+        trip.pickup_longitude,
+        trip.dropoff_latitude,
+        trip.dropoff_longitude,
+    )
+    speed = lookup["median_speed_kph"][int(pickup.weekday() >= 5)][pickup.hour]
+    if not math.isfinite(speed) or speed <= 0:
+        speed = lookup["overall_speed_kph"]
+    return float(distance) / speed * 3600
+
+
+def save_lookup(lookup: dict, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(lookup, f)
+    os.replace(tmp_path, path)
+
+
+def load_lookup(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,65 @@
+import math
+import sys
+
+import numpy as np
+import pandas as pd
+
+from src.utils.logger import get_logger
+
+# resource is POSIX-only; psutil (an mlflow dependency) covers Windows
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+logger = get_logger(__name__)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if it cannot be read."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KiB, macOS bytes
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().peak_wset / 1024 / 1024
+    except (ImportError, AttributeError):
+        return None
+
+
+def log_peak_rss(step: str, report: dict):
+    """Logs the peak RSS after `step` and records it as an MLflow-ready metric."""
+    peak = peak_rss_mb()
+    if peak is not None:
+        report[f"peak_rss_mb_{step}"] = round(peak, 1)
+        logger.info(f"🧠 PEAK RSS AFTER {step.upper()}: {peak:,.0f} MB")
+
+
+def split_permutation(n_rows: int, test_size: float, random_state: int) -> np.ndarray:
+    """Row order [train..., test...] drawn exactly like sklearn's train_test_split."""
+    n_test = math.ceil(test_size * n_rows)
+    permutation = np.random.RandomState(random_state).permutation(n_rows)
+    return np.concatenate([permutation[n_test:], permutation[:n_test]])
+
+
+def build_training_matrix(
+    df: pd.DataFrame, features: list, target: str, test_size: float, random_state: int
+):
+    """
+    Writes the features into one C-contiguous float32 matrix whose rows are already in
+    split order, so the train/test sets are slices (views) of it. float32 is the dtype
+    sklearn's trees use internally, so fit() runs on the matrix without another copy.
+    Returns (X_train, X_test, y_train, y_test); splits match train_test_split row for row.
+    """
+    order = split_permutation(len(df), test_size, random_state)
+    n_train = len(df) - math.ceil(test_size * len(df))
+
+    X = np.empty((len(df), len(features)), dtype=np.float32)
+    for i, name in enumerate(features):
+        # One column at a time: the only temporary is a single gathered column
+        X[:, i] = df[name].to_numpy()[order]
+    y = df[target].to_numpy(dtype=np.float64)[order]
+
+    return X[:n_train], X[n_train:], y[:n_train], y[n_train:]
@@ -12,8 +12,41 @@ else:
 # DATA PATHS
 DATA_RAW_PATH = os.path.join(ROOT_DIR, "data", "raw", DATA_FILENAME)
 MODEL_SAVE_PATH = os.path.join(ROOT_DIR, "models", "nyc_taxi_model.onnx")
+FOREST_SAVE_PATH = os.path.join(ROOT_DIR, "models", "nyc_taxi_forest.joblib")
+DRIFT_REFERENCE_PATH = os.path.join(ROOT_DIR, "models", "drift_reference.json")
+SPEED_LOOKUP_PATH = os.path.join(ROOT_DIR, "models", "speed_lookup.json")
+# Versioned models: <registry>/<sha256[:8]>/{model.onnx,manifest.json} + CURRENT
+MODEL_REGISTRY_DIR = os.path.join(ROOT_DIR, "models", "registry")
+# Retention: the newest N versions are kept, plus CURRENT and any version pinned by a
+# deployment or client (comma-separated, e.g. MODEL_REGISTRY_PINNED=0a0b0c0d,1f2e3d4c)
+MODEL_REGISTRY_KEEP = int(os.getenv("MODEL_REGISTRY_KEEP", "10"))
+MODEL_REGISTRY_PINNED = [
+    v.strip() for v in os.getenv("MODEL_REGISTRY_PINNED", "").split(",") if v.strip()
+]
+
+# INCREMENTAL REFRESH: new trip drops land here as one CSV per partition (e.g. per day)
+DATA_PARTITIONS_DIR = os.path.join(ROOT_DIR, "data", "raw", "partitions")
+FEATURE_CACHE_DIR = os.path.join(ROOT_DIR, "data", "features")
+REFRESH_STATE_PATH = os.path.join(ROOT_DIR, "models", "refresh_state.json")
+
 LOG_FILE_PATH = os.path.join(ROOT_DIR, "logs", "running_logs.log")
 
+# MODEL FEATURES (order = ONNX input column order)
+FEATURES = [
+    "passenger_count",
+    "pickup_longitude",
+    "pickup_latitude",
+    "dropoff_longitude",
+    "dropoff_latitude",
+    "month",
+    "day_of_week",
+    "hour",
+    "is_weekend",
+    "distance_haversine",
+    "distance_manhattan",
+    "bearing",
+]
+
 # MODEL PARAMETERS
 NYC_BOUNDS = {
     "min_lng": -74.3,
@@ -22,10 +55,43 @@ NYC_BOUNDS = {
     "max_lat": 40.9,
 }
 
+# DATA CLEANING RULES
+MIN_TRIP_DURATION = 60  # seconds
+MAX_TRIP_DURATION = 10800  # seconds (3 hours)
+MIN_SPEED_KPH = 0.1
+MAX_SPEED_KPH = 100
+
+# Raw request fields fed to the fused ONNX graph, one [N, 1] float tensor each
+RAW_INPUTS = [
+    "passenger_count",
+    "pickup_longitude",
+    "pickup_latitude",
+    "dropoff_longitude",
+    "dropoff_latitude",
+    "month",
+    "day_of_week",
+    "hour",
+]
+
+# MODEL EXPORT
+# "standard": 12 engineered features in, log duration out (features built in Python)
+# "fused": raw trip fields in, feature engineering + expm1 inside the ONNX graph
+MODEL_EXPORT_MODE = os.getenv("MODEL_EXPORT_MODE", "standard")
+# Adds P10/P90 of the per-tree predictions as a second model output
+MODEL_EXPORT_QUANTILES = os.getenv("MODEL_EXPORT_QUANTILES", "false").lower() == "true"
+PREDICTION_QUANTILES = (0.1, 0.9)
+
 # TRAINING SETTINGS
 RANDOM_STATE = 42
 TEST_SIZE = 0.2
 
+# INCREMENTAL REFRESH SETTINGS
+REFRESH_NEW_TREES = 20  # trees appended per refresh (warm start)
+REFRESH_MAX_TREES = 80  # refresh-added trees kept on top of the base forest
+REFRESH_HOLDOUT_FRACTION = 0.2  # newest slice of the delta used for evaluation
+REFRESH_MIN_ROWS = 50
+REFRESH_REPLAY_TOLERANCE = 0.01  # max relative RMSE rise on replayed history
+
 # MLFLOW CONFIG
 MLFLOW_TRACKING_URI = "http://localhost:5000"
 MLFLOW_EXPERIMENT_NAME = "NYC_Taxi_V1"
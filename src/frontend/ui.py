@@ -1,12 +1,50 @@
 import os
 from datetime import datetime
 
+import altair as alt
 import pandas as pd
 import requests
 import streamlit as st
 
 # API ADDRESS
 API_URL = os.getenv("API_URL", "http://127.0.0.1:8000/predict")
+BATCH_URL = os.getenv("API_BATCH_URL", f"{API_URL.rstrip('/')}/batch")
+
+
+@st.cache_resource
+def http_session() -> requests.Session:
+    """One pooled keep-alive session per UI process, shared across reruns."""
+    return requests.Session()
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def predict_week_grid(
+    week_start, passenger_count, pickup_lat, pickup_lon, dropoff_lat, dropoff_lon
+) -> pd.DataFrame:
+    """ETA of the same trip for every hour of 7 days, scored in one batch request."""
+    slots = pd.date_range(pd.Timestamp(week_start), periods=7 * 24, freq="h")
+    trips = [
+        {
+            "pickup_datetime": str(slot),
+            "pickup_longitude": pickup_lon,
+            "pickup_latitude": pickup_lat,
+            "dropoff_longitude": dropoff_lon,
+            "dropoff_latitude": dropoff_lat,
+            "passenger_count": passenger_count,
+        }
+        for slot in slots
+    ]
+    response = http_session().post(BATCH_URL, json={"trips": trips}, timeout=30)
+    response.raise_for_status()
+
+    return pd.DataFrame(
+        {
+            "day": slots.strftime("%a %d %b"),
+            "hour": slots.hour,
+            "minutes": response.json()["predicted_duration_minutes"],
+        }
+    )
+
 
 st.set_page_config(
     page_title="NYC Taxi Time Prediction",
@@ -64,7 +102,7 @@ if st.button("🚀 Estimate the time", type="primary", use_container_width=True)
     # 2. SEND A REQUEST TO THE API
     with st.spinner("The model is communicating with the API..."):
         try:
-            response = requests.post(API_URL, json=payload)
+            response = http_session().post(API_URL, json=payload, timeout=10)
 
             if response.status_code == 200:
                 result = response.json()
@@ -91,6 +129,52 @@ if st.button("🚀 Estimate the time", type="primary", use_container_width=True)
             st.error(f"An unexpected error occurred: {e}")
 
 
+# WHAT-IF MODE: ETA HEATMAP
+st.divider()
+st.subheader("🔮 What-if: ETA by Day and Hour")
+st.caption(
+    "The same trip at every hour of the 7 days starting on the trip date, "
+    "sent to the API as a single batch."
+)
+if st.button("📊 Build the ETA heatmap", width="stretch"):
+    with st.spinner("Scoring 168 departure times..."):
+        try:
+            grid = predict_week_grid(
+                pickup_date,
+                passenger_count,
+                pickup_lat,
+                pickup_lon,
+                dropoff_lat,
+                dropoff_lon,
+            )
+
+            heatmap = (
+                alt.Chart(grid)
+                .mark_rect()
+                .encode(
+                    x=alt.X("hour:O", title="Pickup hour"),
+                    y=alt.Y("day:O", sort=list(grid["day"].unique()), title=None),
+                    color=alt.Color("minutes:Q", title="ETA (min)"),
+                    tooltip=["day", "hour", "minutes"],
+                )
+            )
+            st.altair_chart(heatmap, width="stretch")
+
+            fastest = grid.loc[grid["minutes"].idxmin()]
+            st.info(
+                f"🏎️ Fastest departure: {fastest['day']} {fastest['hour']:02d}:00 "
+                f"({fastest['minutes']} dk)"
+            )
+
+        except requests.exceptions.ConnectionError:
+            st.error("❌ Error: Could not connect to the API!")
+        except requests.exceptions.HTTPError as e:
+            st.error(f"Error: API returned code {e.response.status_code}.")
+            st.write(e.response.text)
+        except Exception as e:
+            st.error(f"An unexpected error occurred: {e}")
+
+
 # SIDEBAR
 with st.sidebar:
     st.header("ℹ️ About the Project")
@@ -0,0 +1,365 @@
+import copy
+import glob
+import json
+import os
+
+import joblib
+import mlflow
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_squared_error
+
+from src.components.data_ingestion import TRAINING_COLUMNS, clean_trips
+from src.components.feature_engineering import create_features
+from src.components.model_registry import ModelRegistry, publish_model
+from src.components.model_trainer import build_onnx_model, save_onnx_model
+from src.config import (
+    DATA_PARTITIONS_DIR,
+    FEATURE_CACHE_DIR,
+    FEATURES,
+    FOREST_SAVE_PATH,
+    MODEL_EXPORT_MODE,
+    MODEL_EXPORT_QUANTILES,
+    MODEL_REGISTRY_DIR,
+    MODEL_REGISTRY_KEEP,
+    MODEL_REGISTRY_PINNED,
+    MODEL_SAVE_PATH,
+    RANDOM_STATE,
+    REFRESH_HOLDOUT_FRACTION,
+    REFRESH_MAX_TREES,
+    REFRESH_MIN_ROWS,
+    REFRESH_NEW_TREES,
+    REFRESH_REPLAY_TOLERANCE,
+    REFRESH_STATE_PATH,
+)
+from src.pipelines.training_pipeline import setup_mlflow
+from src.utils.data_fetch import file_sha256
+from src.utils.logger import get_logger
+
+logger = get_logger("incremental_pipeline")
+
+
+def _load_state() -> dict:
+    if not os.path.exists(REFRESH_STATE_PATH):
+        return {"partitions": {}}
+    with open(REFRESH_STATE_PATH) as f:
+        return json.load(f)
+
+
+def _atomic_write(path: str, write):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _save_state(state: dict):
+    def write(tmp_path):
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+
+    _atomic_write(REFRESH_STATE_PATH, write)
+
+
+def partition_features(path: str, sha256: str):
+    """
+    Returns (X float32, y log1p, t pickup epoch seconds) for one partition. Features are
+    computed once per partition content and cached as .npz, so old partitions are never
+    re-featurized (caches written before `t` was stored are rebuilt once).
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    cache_path = os.path.join(FEATURE_CACHE_DIR, f"{name}-{sha256[:12]}.npz")
+
+    if os.path.exists(cache_path):
+        with np.load(cache_path) as cached:
+            if "t" in cached.files:
+                return cached["X"], cached["y"], cached["t"]
+
+    df = pd.read_csv(path, usecols=TRAINING_COLUMNS)
+    df, drop_counts = clean_trips(df)
+    df = create_features(df)
+    logger.info(f"🛠️ FEATURIZED {name}: {len(df)} ROWS | {drop_counts}")
+
+    X = df[FEATURES].to_numpy(dtype=np.float32)
+    y = np.log1p(df["trip_duration"].to_numpy(dtype=np.float64))
+    t = df["pickup_datetime"].to_numpy().astype("datetime64[s]").astype(np.int64)
+
+    def write(tmp_path):
+        with open(tmp_path, "wb") as f:
+            np.savez(f, X=X, y=y, t=t)
+
+    _atomic_write(cache_path, write)
+    return X, y, t
+
+
+def scan_partitions(paths: list, seen: dict):
+    """
+    Splits partitions into (new, old) against the refresh state, where `seen` maps a file
+    name to {"sha256", "size", "mtime_ns"}. A file whose size and mtime match its entry is
+    old without being read; any other file is hashed, and is new only if its content
+    changed (a touched but identical file is re-stamped in `seen`).
+    Returns ({new path: sha256}, old paths).
+    """
+    new, old = {}, []
+    for path in paths:
+        name = os.path.basename(path)
+        entry = seen.get(name)
+        stat = os.stat(path)
+        stamp = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        # States written before stamps were recorded map the name to its sha256 alone
+        if isinstance(entry, str):
+            entry = {"sha256": entry}
+        if entry and all(entry.get(k) == v for k, v in stamp.items()):
+            old.append(path)
+            continue
+
+        sha256 = file_sha256(path)
+        if entry and entry["sha256"] == sha256:
+            seen[name] = {"sha256": sha256, **stamp}
+            old.append(path)
+        else:
+            new[path] = sha256
+    return new, old
+
+
+def sample_history(old: list, seen: dict, n_rows: int, rng):
+    """
+    Cached features of seen partitions, taken in random order until at least `n_rows`
+    rows are in hand: replay needs a sample of history, so its cost follows the size of
+    the delta rather than the whole history.
+    """
+    X_parts, y_parts, total = [], [], 0
+    for i in rng.permutation(len(old)):
+        if total >= n_rows:
+            break
+        entry = seen[os.path.basename(old[i])]
+        X, y, _ = partition_features(old[i], entry["sha256"])
+        X_parts.append(X)
+        y_parts.append(y)
+        total += len(y)
+
+    X_history = np.concatenate(X_parts or [np.empty((0, len(FEATURES)), np.float32)])
+    y_history = np.concatenate(y_parts or [np.empty(0)])
+    return X_history, y_history
+
+
+def split_holdout(X, y, t, fraction: float):
+    """
+    Orders the delta by pickup time and returns ((X_train, y_train), (X_holdout, y_holdout)),
+    the holdout being the newest `fraction` of rows, whatever order the files came in.
+    """
+    order = np.argsort(t, kind="stable")
+    X, y = X[order], y[order]
+    n_holdout = max(1, int(len(y) * fraction))
+    return (X[:-n_holdout], y[:-n_holdout]), (X[-n_holdout:], y[-n_holdout:])
+
+
+def should_promote(holdout: tuple, replay: tuple, tolerance: float) -> bool:
+    """
+    holdout and replay are (rmse_current, rmse_candidate). The candidate must beat the
+    live model on the new holdout and stay within `tolerance` (relative) of it on the
+    history replay slice.
+    """
+    if not holdout[1] < holdout[0]:
+        return False
+    return replay is None or replay[1] <= replay[0] * (1 + tolerance)
+
+
+def _rmse(model, X, y) -> float:
+    preds = model.predict(pd.DataFrame(X, columns=FEATURES))
+    return float(np.sqrt(mean_squared_error(y, preds)))
+
+
+def refresh_forest(forest, X_new, y_new, X_history, y_history, rng):
+    """
+    Appends REFRESH_NEW_TREES trees fitted on the new rows plus an equal-size replay sample
+    of history, then drops the oldest refresh-added trees beyond REFRESH_MAX_TREES. The base
+    trees fitted on the full training set are always kept (their count is carried on the
+    forest as `n_base_estimators_`). The input forest is untouched.
+    """
+    if len(y_history):
+        replay = rng.choice(
+            len(y_history), size=min(len(y_new), len(y_history)), replace=False
+        )
+        X_fit = np.concatenate([X_new, X_history[replay]])
+        y_fit = np.concatenate([y_new, y_history[replay]])
+    else:
+        X_fit, y_fit = X_new, y_new
+
+    n_base = getattr(forest, "n_base_estimators_", len(forest.estimators_))
+    candidate = copy.deepcopy(forest)
+    candidate.set_params(
+        warm_start=True, n_estimators=len(candidate.estimators_) + REFRESH_NEW_TREES
+    )
+    candidate.fit(pd.DataFrame(X_fit, columns=FEATURES), y_fit)
+
+    added = candidate.estimators_[n_base:]
+    candidate.estimators_ = candidate.estimators_[:n_base] + added[-REFRESH_MAX_TREES:]
+    candidate.n_base_estimators_ = n_base
+    candidate.set_params(n_estimators=len(candidate.estimators_), warm_start=False)
+    return candidate
+
+
+def run_refresh():
+    """
+    Refreshes the production forest from new partitions in DATA_PARTITIONS_DIR.
+    Cost scales with the delta: only new partitions are featurized and fitted, and
+    the ONNX model is re-exported only if the candidate beats the live model on
+    the rolling holdout (the newest slice of the new data by pickup time) without
+    regressing on a replay slice of history.
+    """
+    try:
+        logger.info("🔄 INCREMENTAL REFRESH PIPELINE INITIALIZED")
+
+        if not os.path.exists(FOREST_SAVE_PATH):
+            raise FileNotFoundError(
+                f"❌ NO BASE FOREST AT {FOREST_SAVE_PATH}. Run the training pipeline first."
+            )
+
+        # ---------------------------------------------------------
+        # 1. DISCOVER NEW PARTITIONS
+        # ---------------------------------------------------------
+        state = _load_state()
+        seen = state["partitions"]
+
+        partitions = sorted(glob.glob(os.path.join(DATA_PARTITIONS_DIR, "*.csv")))
+        hashes, old = scan_partitions(partitions, seen)
+        new = sorted(hashes)
+
+        if not new:
+            _save_state(state)  # keeps re-stamped entries, so they are not hashed again
+            logger.info("✅ NO NEW PARTITIONS. MODEL IS UP TO DATE.")
+            return False
+
+        logger.info(f"📥 NEW PARTITIONS: {[os.path.basename(p) for p in new]}")
+
+        # ---------------------------------------------------------
+        # 2. FEATURES (cached per partition; history is only sampled)
+        # ---------------------------------------------------------
+        new_parts = [partition_features(p, hashes[p]) for p in new]
+        X_delta = np.concatenate([X for X, _, _ in new_parts])
+        y_delta = np.concatenate([y for _, y, _ in new_parts])
+        t_delta = np.concatenate([t for _, _, t in new_parts])
+
+        if len(y_delta) < REFRESH_MIN_ROWS:
+            logger.warning(
+                f"⚠️ ONLY {len(y_delta)} NEW ROWS (< {REFRESH_MIN_ROWS}). WAITING FOR MORE DATA."
+            )
+            return False
+
+        # Enough history for the replay fit sample and the replay evaluation slice
+        rng = np.random.default_rng(RANDOM_STATE + len(seen))
+        X_history, y_history = sample_history(old, seen, len(y_delta), rng)
+
+        # Rolling holdout: the newest rows of the delta are never trained on.
+        (X_train, y_train), (X_holdout, y_holdout) = split_holdout(
+            X_delta, y_delta, t_delta, REFRESH_HOLDOUT_FRACTION
+        )
+
+        # ---------------------------------------------------------
+        # 3. WARM-START CANDIDATE & EVALUATION
+        # ---------------------------------------------------------
+        setup_mlflow()
+        with mlflow.start_run(run_name="Incremental_Refresh"):
+            forest = joblib.load(FOREST_SAVE_PATH)
+
+            # Replay evaluation slice: history rows held out of the new trees' fit,
+            # so a regression on older trips blocks promotion too.
+            is_replay_eval = np.zeros(len(y_history), dtype=bool)
+            is_replay_eval[
+                rng.choice(
+                    len(y_history),
+                    size=min(len(y_holdout), len(y_history)),
+                    replace=False,
+                )
+            ] = True
+            candidate = refresh_forest(
+                forest,
+                X_train,
+                y_train,
+                X_history[~is_replay_eval],
+                y_history[~is_replay_eval],
+                rng,
+            )
+
+            rmse_current = _rmse(forest, X_holdout, y_holdout)
+            rmse_candidate = _rmse(candidate, X_holdout, y_holdout)
+            replay = None
+            metrics = {
+                "new_rows": len(y_delta),
+                "replay_rows": min(len(y_train), int((~is_replay_eval).sum())),
+                "holdout_rmse_current": rmse_current,
+                "holdout_rmse_candidate": rmse_candidate,
+                "n_trees": len(candidate.estimators_),
+            }
+            if is_replay_eval.any():
+                X_replay, y_replay = (
+                    X_history[is_replay_eval],
+                    y_history[is_replay_eval],
+                )
+                replay = (
+                    _rmse(forest, X_replay, y_replay),
+                    _rmse(candidate, X_replay, y_replay),
+                )
+                metrics["replay_rmse_current"], metrics["replay_rmse_candidate"] = (
+                    replay
+                )
+                logger.info(
+                    f"📊 REPLAY RMSE | CURRENT: {replay[0]:.4f} | CANDIDATE: {replay[1]:.4f}"
+                )
+            improved = should_promote(
+                (rmse_current, rmse_candidate), replay, REFRESH_REPLAY_TOLERANCE
+            )
+
+            mlflow.log_metrics(metrics)
+            logger.info(
+                f"📊 HOLDOUT RMSE | CURRENT: {rmse_current:.4f} | CANDIDATE: {rmse_candidate:.4f}"
+            )
+
+            # ---------------------------------------------------------
+            # 4. PROMOTE ONLY ON IMPROVEMENT
+            # ---------------------------------------------------------
+            if improved:
+                logger.info("🏆 CANDIDATE IMPROVED. EXPORTING NEW ONNX MODEL...")
+                onnx_model = build_onnx_model(candidate, len(FEATURES))
+                save_onnx_model(onnx_model, MODEL_SAVE_PATH)
+                registry = ModelRegistry(MODEL_REGISTRY_DIR)
+                version = publish_model(
+                    registry,
+                    onnx_model,
+                    X_holdout,
+                    metrics={"holdout_rmse": float(rmse_candidate)},
+                    export_mode=MODEL_EXPORT_MODE,
+                    export_quantiles=MODEL_EXPORT_QUANTILES,
+                )
+                mlflow.log_param("model_version", version)
+                registry.prune(MODEL_REGISTRY_KEEP, MODEL_REGISTRY_PINNED)
+                _atomic_write(
+                    FOREST_SAVE_PATH, lambda tmp_path: joblib.dump(candidate, tmp_path)
+                )
+                mlflow.log_artifact(MODEL_SAVE_PATH, artifact_path="onnx_model")
+            else:
+                logger.info(
+                    "⏸️ CANDIDATE DID NOT IMPROVE (OR REGRESSED ON HISTORY). KEEPING THE LIVE MODEL."
+                )
+
+        # New partitions become history either way.
+        for path in new:
+            stat = os.stat(path)
+            seen[os.path.basename(path)] = {
+                "sha256": hashes[path],
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+            }
+        _save_state(state)
+
+        logger.info("🏁 INCREMENTAL REFRESH FINISHED")
+        return improved
+
+    except Exception as e:
+        logger.error(f"❌ FAILURE: {e}")
+        raise e
+
+
+if __name__ == "__main__":
+    run_refresh()
@@ -6,21 +6,59 @@ import mlflow
 import mlflow.sklearn
 import numpy as np
 import pandas as pd
-from skl2onnx import convert_sklearn
-from skl2onnx.common.data_types import FloatTensorType
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, mean_squared_error
-from sklearn.model_selection import train_test_split
 
-from src.components.data_ingestion import load_and_clean_data
+from src.components.data_ingestion import TRAINING_COLUMNS, clean_trips, load_raw_data
+from src.components.drift import build_reference, save_reference
 from src.components.feature_engineering import create_features
+from src.components.model_registry import ModelRegistry, publish_model
+from src.components.model_trainer import build_onnx_model, save_onnx_model
+from src.components.speed_lookup import (
+    SPEED_LOOKUP_FEATURES,
+    build_speed_lookup,
+    save_lookup,
+)
+from src.components.training_data import build_training_matrix, log_peak_rss
+
 # Project Modules
-from src.config import DATA_RAW_PATH, MLFLOW_EXPERIMENT_NAME, MODEL_SAVE_PATH
+from src.config import (
+    DATA_RAW_PATH,
+    DRIFT_REFERENCE_PATH,
+    FEATURES,
+    FOREST_SAVE_PATH,
+    MLFLOW_EXPERIMENT_NAME,
+    MODEL_EXPORT_MODE,
+    MODEL_EXPORT_QUANTILES,
+    MODEL_REGISTRY_DIR,
+    MODEL_REGISTRY_KEEP,
+    MODEL_REGISTRY_PINNED,
+    MODEL_SAVE_PATH,
+    RANDOM_STATE,
+    SPEED_LOOKUP_PATH,
+    TEST_SIZE,
+)
 from src.utils.logger import get_logger
 
 logger = get_logger("training_pipeline")
 
 
+def setup_mlflow():
+    tracking_uri = os.getenv("MLFLOW_TRACKING_URI")
+
+    if not tracking_uri:
+        mlruns_path = pathlib.Path("./mlruns").resolve()
+        tracking_uri = mlruns_path.as_uri()
+        logger.warning(
+            f"⚠️ No MLFLOW_TRACKING_URI found. Using Local File Store: {tracking_uri}"
+        )
+    else:
+        logger.info(f"📡 Connecting to MLflow Server at: {tracking_uri}")
+
+    mlflow.set_tracking_uri(tracking_uri)
+    mlflow.set_experiment(MLFLOW_EXPERIMENT_NAME)
+
+
 def run_training():
     """
     Executes the training pipeline with FIXED PRODUCTION PARAMETERS.
@@ -32,19 +70,7 @@ def run_training():
         # ---------------------------------------------------------
         # 1. MLFLOW CONNECTION SETUP
         # ---------------------------------------------------------
-        tracking_uri = os.getenv("MLFLOW_TRACKING_URI")
-
-        if not tracking_uri:
-            mlruns_path = pathlib.Path("./mlruns").resolve()
-            tracking_uri = mlruns_path.as_uri()
-            logger.warning(
-                f"⚠️ No MLFLOW_TRACKING_URI found. Using Local File Store: {tracking_uri}"
-            )
-        else:
-            logger.info(f"📡 Connecting to MLflow Server at: {tracking_uri}")
-
-        mlflow.set_tracking_uri(tracking_uri)
-        mlflow.set_experiment(MLFLOW_EXPERIMENT_NAME)
+        setup_mlflow()
 
         # ---------------------------------------------------------
         # 2. DATA LOADING & PREPROCESSING
@@ -55,44 +81,34 @@ def run_training():
             abs_data_path = os.path.abspath(DATA_RAW_PATH)
             raise FileNotFoundError(f"❌ DATA FILE NOT FOUND AT: {abs_data_path}")
 
-        df = load_and_clean_data(DATA_RAW_PATH)
+        memory_report = {}
+        df = load_raw_data(DATA_RAW_PATH, usecols=TRAINING_COLUMNS)
+        raw_rows = len(df)
+        log_peak_rss("load", memory_report)
+
+        # Duration, NYC bounds and velocity rules in one vectorized pass
+        df, drop_counts = clean_trips(df)
+        logger.info(f"🧹 CLEANUP: {raw_rows} -> {len(df)} ROWS | {drop_counts}")
+        log_peak_rss("clean", memory_report)
 
         logger.info("🛠️ APPLYING FEATURE ENGINEERING...")
         df_processed = create_features(df)
-
-        # Velocity Filter
-        df_processed["avg_speed_kph"] = (
-            df_processed["distance_haversine"] / df_processed["trip_duration"]
-        ) * 3600
-        df_processed = df_processed[
-            (df_processed["avg_speed_kph"] <= 100)
-            & (df_processed["avg_speed_kph"] >= 0.1)
-        ]
+        del df
 
         df_processed["trip_duration_log"] = np.log1p(df_processed["trip_duration"])
+        log_peak_rss("features", memory_report)
 
-        # Features
-        features = [
-            "passenger_count",
-            "pickup_longitude",
-            "pickup_latitude",
-            "dropoff_longitude",
-            "dropoff_latitude",
-            "month",
-            "day_of_week",
-            "hour",
-            "is_weekend",
-            "distance_haversine",
-            "distance_manhattan",
-            "bearing",
-        ]
         target = "trip_duration_log"
 
-        X = df_processed[features]
-        y = df_processed[target]
-
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42
+        # One float32 matrix in split order; train/test are views into it
+        X_train, X_test, y_train, y_test = build_training_matrix(
+            df_processed, FEATURES, target, TEST_SIZE, RANDOM_STATE
+        )
+        del df_processed
+        log_peak_rss("matrix", memory_report)
+        logger.info(
+            f"🧮 TRAINING MATRIX: {X_train.shape[0]} + {X_test.shape[0]} ROWS, "
+            f"{(X_train.nbytes + X_test.nbytes) / 1024**2:.1f} MB float32"
         )
 
         # ---------------------------------------------------------
@@ -112,11 +128,14 @@ def run_training():
 
         with mlflow.start_run(run_name="Production_Best_Model"):
             mlflow.log_params(prod_params)
+            mlflow.log_metrics(drop_counts)
 
+            # The DataFrame wrapper only adds feature names; it shares the float32 buffer
             model = RandomForestRegressor(**prod_params)
-            model.fit(X_train, y_train)
+            model.fit(pd.DataFrame(X_train, columns=FEATURES, copy=False), y_train)
+            log_peak_rss("fit", memory_report)
 
-            y_pred = model.predict(X_test)
+            y_pred = model.predict(pd.DataFrame(X_test, columns=FEATURES, copy=False))
             rmse = np.sqrt(mean_squared_error(y_test, y_pred))
             mae = mean_absolute_error(y_test, y_pred)
 
@@ -125,20 +144,52 @@ def run_training():
 
             logger.info(f"✅ MODEL TRAINED | RMSE: {rmse:.4f}")
 
+            # Reference distributions for the API drift monitor
+            reference = build_reference(
+                {
+                    **{name: X_train[:, i] for i, name in enumerate(FEATURES)},
+                    "prediction": np.expm1(y_pred),
+                }
+            )
+            save_reference(reference, DRIFT_REFERENCE_PATH)
+            mlflow.log_artifact(DRIFT_REFERENCE_PATH, artifact_path="monitoring")
+
+            # Fallback estimates the API serves while it sheds load
+            lookup = build_speed_lookup(
+                *(X_train[:, FEATURES.index(name)] for name in SPEED_LOOKUP_FEATURES),
+                np.expm1(y_train),
+            )
+            save_lookup(lookup, SPEED_LOOKUP_PATH)
+            mlflow.log_artifact(SPEED_LOOKUP_PATH, artifact_path="monitoring")
+
             # ---------------------------------------------------------
             # 4. EXPORT TO ONNX
             # ---------------------------------------------------------
             logger.info(f"📦 EXPORTING ONNX MODEL...")
 
-            initial_type = [("float_input", FloatTensorType([None, len(features)]))]
-            onnx_model = convert_sklearn(model, initial_types=initial_type)
-
-            save_dir = os.path.dirname(MODEL_SAVE_PATH)
-            if save_dir and not os.path.exists(save_dir):
-                os.makedirs(save_dir)
+            onnx_model = build_onnx_model(model, len(FEATURES))
+            mlflow.log_param("export_quantiles", MODEL_EXPORT_QUANTILES)
+            mlflow.log_param("export_mode", MODEL_EXPORT_MODE)
+
+            save_onnx_model(onnx_model, MODEL_SAVE_PATH)
+
+            # Content-addressed version the API serves (and callers can pin)
+            registry = ModelRegistry(MODEL_REGISTRY_DIR)
+            version = publish_model(
+                registry,
+                onnx_model,
+                X_test,
+                metrics={"rmse": float(rmse), "mae": float(mae)},
+                export_mode=MODEL_EXPORT_MODE,
+                export_quantiles=MODEL_EXPORT_QUANTILES,
+            )
+            mlflow.log_param("model_version", version)
+            registry.prune(MODEL_REGISTRY_KEEP, MODEL_REGISTRY_PINNED)
 
-            with open(MODEL_SAVE_PATH, "wb") as f:
-                f.write(onnx_model.SerializeToString())
+            # The sklearn forest is kept for incremental refreshes (warm start)
+            joblib.dump(model, FOREST_SAVE_PATH)
+            log_peak_rss("export", memory_report)
+            mlflow.log_metrics(memory_report)
 
             # Artifact Loglama
             mlflow.log_artifact(MODEL_SAVE_PATH, artifact_path="onnx_model")
@@ -0,0 +1,190 @@
+import hashlib
+import os
+import zipfile
+
+import gdown
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+def _sidecar_path(filepath: str) -> str:
+    return f"{filepath}.sha256"
+
+
+def file_sha256(filepath: str) -> str:
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_sidecar(filepath: str):
+    """Returns (sha256, size) recorded next to a verified file, or None."""
+    try:
+        with open(_sidecar_path(filepath)) as f:
+            sha256, size = f.read().split()
+        return sha256, int(size)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_sidecar(filepath: str, sha256: str, size: int):
+    tmp_path = f"{_sidecar_path(filepath)}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(f"{sha256} {size}\n")
+    os.replace(tmp_path, _sidecar_path(filepath))
+
+
+def is_verified(filepath: str, expected_sha256: str = None) -> bool:
+    """
+    A file is usable when it matches its sidecar (cheap size check) and, if an
+    expected hash is pinned, that hash. A file without a sidecar is re-hashed
+    against the expected hash; with nothing to compare it to, it is not trusted
+    and the caller fetches a fresh copy.
+    """
+    if not os.path.exists(filepath):
+        return False
+
+    recorded = read_sidecar(filepath)
+    if recorded:
+        sha256, size = recorded
+        if os.path.getsize(filepath) != size:
+            return False
+        return expected_sha256 is None or sha256 == expected_sha256
+
+    if expected_sha256 is None:
+        return False
+
+    sha256 = file_sha256(filepath)
+    if sha256 != expected_sha256:
+        return False
+    _write_sidecar(filepath, sha256, os.path.getsize(filepath))
+    return True
+
+
+def _atomic_copy(src, dest: str, expected_sha256: str = None) -> str:
+    """
+    Streams `src` into dest via a temp file, hashing on the way. The temp file is renamed
+    into place only if its hash matches `expected_sha256` (when given), else ValueError.
+    """
+    tmp_path = f"{dest}.tmp"
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp_path, "wb") as out:
+            for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+            out.flush()
+            os.fsync(out.fileno())
+        sha256 = digest.hexdigest()
+        if expected_sha256 and sha256 != expected_sha256:
+            raise ValueError(
+                f"Checksum mismatch for {os.path.basename(dest)}: {sha256} != {expected_sha256}"
+            )
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    os.replace(tmp_path, dest)
+    _write_sidecar(dest, sha256, size)
+    return sha256
+
+
+def _copy_verified(src_path: str, dest: str, expected_sha256: str = None):
+    """Publishes a verified file under another path (a copy, so neither side can corrupt the other)."""
+    with open(src_path, "rb") as src:
+        _atomic_copy(src, dest, expected_sha256)
+
+
+def extract_member(
+    archive_path: str, member: str, dest: str, expected_sha256: str = None
+) -> str:
+    """
+    Stream-extracts one archive member to dest (no full extractall) and returns its sha256.
+    Nothing appears at dest unless the member matches `expected_sha256` (when given).
+    """
+    with zipfile.ZipFile(archive_path) as zf:
+        with zf.open(member) as src:
+            return _atomic_copy(src, dest, expected_sha256)
+
+
+def fetch_dataset(
+    filepath: str, drive_file_id: str, cache_dir: str = None, expected_sha256=None
+):
+    """
+    Makes `filepath` available and verified. Sources, in order:
+    1. the file already in place, 2. a verified copy in the cache/mirror directory,
+    3. an archive left in the cache, 4. a resumable Google Drive download into the cache.
+    The target only ever appears through an atomic rename, so an interrupted run
+    cannot leave a half-written CSV behind.
+    """
+    if is_verified(filepath, expected_sha256):
+        logger.info(f"✅ DATA FOUND AT: {filepath}")
+        return
+
+    directory = os.path.dirname(filepath)
+    os.makedirs(directory, exist_ok=True)
+    member = os.path.basename(filepath)
+
+    use_mirror = cache_dir is not None
+    cache_dir = cache_dir or directory
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # 1. LOCAL MIRROR
+    mirrored = os.path.join(cache_dir, member)
+    if os.path.abspath(mirrored) != os.path.abspath(filepath) and is_verified(
+        mirrored, expected_sha256
+    ):
+        logger.info(f"📁 USING DATA FROM MIRROR: {mirrored}")
+        _copy_verified(mirrored, filepath, expected_sha256)
+        return
+
+    # 2. DOWNLOAD (gdown keeps a .part file and resumes it with a Range request)
+    archive_path = os.path.join(cache_dir, f"{drive_file_id}.zip")
+    for attempt in (1, 2):
+        if not os.path.exists(archive_path):
+            logger.info(
+                f"⬇️ DOWNLOADING FROM GOOGLE DRIVE (ID: {drive_file_id}) -> {archive_path}"
+            )
+            gdown.download(
+                f"https://drive.google.com/uc?id={drive_file_id}",
+                archive_path,
+                quiet=False,
+                resume=True,
+            )
+            if not os.path.exists(archive_path):
+                raise FileNotFoundError("Downloaded zip file could not be found.")
+
+        # 3. EXTRACT + VERIFY
+        try:
+            logger.info(f"📦 STREAM-EXTRACTING {member}...")
+            sha256 = extract_member(archive_path, member, filepath, expected_sha256)
+            break
+        except zipfile.BadZipFile:
+            logger.warning(f"⚠️ CORRUPT ARCHIVE, DISCARDING: {archive_path}")
+            os.remove(archive_path)
+            if attempt == 2:
+                raise
+        except ValueError:
+            # Wrong content: the archive is useless, and the target was never touched.
+            os.remove(archive_path)
+            raise
+
+    if not expected_sha256:
+        logger.warning(f"⚠️ NO PINNED SHA256 FOR {member}; FETCHED COPY HAS {sha256}")
+
+    # The archive is only needed until its member is verified on disk.
+    os.remove(archive_path)
+    if use_mirror:
+        # Publish the extracted file to the mirror for the next pod/CI run.
+        _copy_verified(filepath, mirrored)
+
+    logger.info(f"✅ DOWNLOAD & EXTRACTION COMPLETE. File is ready at: {filepath}")
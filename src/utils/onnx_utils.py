@@ -0,0 +1,42 @@
+import numpy as np
+from onnx import helper, numpy_helper
+
+
+class GraphBuilder:
+    """Small helper that names intermediate tensors and collects nodes/constants."""
+
+    def __init__(self, prefix: str = "fe"):
+        self.prefix = prefix
+        self.nodes = []
+        self.initializers = []
+        self._count = 0
+
+    def _name(self, kind):
+        self._count += 1
+        return f"{self.prefix}_{kind}_{self._count}"
+
+    def const(self, value, dtype=np.float32):
+        name = self._name("const")
+        self.initializers.append(
+            numpy_helper.from_array(np.array(value, dtype=dtype), name)
+        )
+        return name
+
+    def op(self, op_type, *inputs, output=None, n_outputs=1, domain=None, **attrs):
+        """Appends a node; returns its output name (or a list when n_outputs > 1)."""
+        if n_outputs == 1:
+            outputs = [output or self._name(op_type.lower())]
+        else:
+            outputs = [self._name(op_type.lower()) for _ in range(n_outputs)]
+        self.nodes.append(
+            helper.make_node(op_type, list(inputs), outputs, domain=domain, **attrs)
+        )
+        return outputs[0] if n_outputs == 1 else outputs
+
+
+def merged_opsets(model):
+    """skl2onnx may list the default domain twice; keep one (highest) entry per domain."""
+    opsets = {}
+    for opset in model.opset_import:
+        opsets[opset.domain] = max(opsets.get(opset.domain, 0), opset.version)
+    return [helper.make_opsetid(domain, version) for domain, version in opsets.items()]
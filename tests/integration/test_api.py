@@ -1,18 +1,46 @@
+import json
 import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import MagicMock, patch
 
 import numpy as np
 import pytest
+import redis
 from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import FloatTensorType
+from sklearn.ensemble import RandomForestRegressor
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+from src.api import main
+from src.api.admission import AdaptiveLimiter
+from src.api.coalescing import SingleFlight
 from src.api.main import app
+from src.api.nearby_cache import NearbyCache
+from src.components.model_registry import ModelRegistry
+from src.config import FEATURES
 
 client = TestClient(app)
 
 
+@pytest.fixture
+def payload():
+    """One valid trip; tests copy it with dict(payload, field=...) to vary a field."""
+    return {
+        "pickup_datetime": "2026-01-20 12:00:00",
+        "passenger_count": 1,
+        "pickup_longitude": -73.9857,
+        "pickup_latitude": 40.7484,
+        "dropoff_longitude": -73.9665,
+        "dropoff_latitude": 40.7812,
+    }
+
+
 def test_root_endpoint():
     response = client.get("/")
     assert response.status_code == 200
@@ -55,3 +83,310 @@ def test_predict_invalid_data():
     bad_payload = {"pickup_datetime": "2026-01-20 12:00:00"}
     response = client.post("/predict", json=bad_payload)
     assert response.status_code == 422
+
+
+@patch("src.api.main.model")
+def test_predict_stage_metrics_exposed(mock_model, payload):
+    mock_model.run.return_value = [np.array([[2.7]])]
+
+    assert client.post("/predict", json=payload).status_code == 200
+
+    metrics = client.get("/metrics").text
+    for stage in ("cache_key", "features", "inference", "encode"):
+        assert f'predict_stage_seconds_count{{stage="{stage}"}}' in metrics
+
+
+def test_profile_endpoints_require_admin_token(monkeypatch):
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+    assert client.get("/admin/profile/cpu?seconds=0.1").status_code == 404
+
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    assert client.get("/admin/profile/cpu?seconds=0.1").status_code == 403
+
+    response = client.get(
+        "/admin/profile/cpu?seconds=0.1", headers={"X-Admin-Token": "secret"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+
+
+@patch("src.api.main.model")
+def test_overloaded_predict_fails_fast(mock_model, payload):
+    mock_model.run.return_value = [np.array([[2.7]])]
+    full = AdaptiveLimiter(initial_limit=1)
+    assert full.try_acquire()
+
+    with patch("src.api.main.admission", full):
+        response = client.post("/predict", json=payload)
+        assert response.status_code == 503
+        assert int(response.headers["Retry-After"]) >= 1
+        mock_model.run.assert_not_called()
+
+        lookup = {"median_speed_kph": [[20.0] * 24] * 2, "overall_speed_kph": 20.0}
+        with patch("src.api.main.speed_lookup", lookup):
+            response = client.post("/predict", json=payload)
+        assert response.status_code == 200
+        assert response.headers["X-Degraded"] == "lookup"
+        assert response.json()["predicted_duration_seconds"] > 0
+
+
+@patch("src.api.main.model")
+def test_predict_batch_scores_all_trips_in_one_run(mock_model, payload):
+    mock_model.run.return_value = [np.array([[2.7], [3.0], [3.3]], dtype=np.float32)]
+
+    # The same instant in three formats
+    formats = ["2026-01-20 12:00:00", "2026-01-20T12:00", "2026-01-20 12:00:00.250"]
+    trips = [dict(payload, pickup_datetime=value) for value in formats]
+    response = client.post("/predict/batch", json={"trips": trips})
+
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert len(data["predicted_duration_seconds"]) == 3
+    assert data["predicted_duration_minutes"][0] == round(np.expm1(2.7) / 60, 2)
+    assert mock_model.run.call_count == 1
+    feed = next(iter(mock_model.run.call_args.args[1].values()))
+    assert (feed == feed[0]).all(), "Formats of one instant gave different features."
+
+    assert client.post("/predict/batch", json={"trips": []}).status_code == 422
+    bad = [payload, dict(payload, pickup_datetime="not a date")]
+    response = client.post("/predict/batch", json={"trips": bad})
+    assert response.status_code == 422
+    assert "trips[1]" in response.json()["detail"]
+    assert mock_model.run.call_count == 1
+
+
+@patch("src.api.main.model")
+def test_predict_exports_saturation_signals(mock_model, payload):
+    mock_model.run.return_value = [np.array([[2.7]])]
+    waits_before = REGISTRY.get_sample_value("predict_queue_wait_seconds_count") or 0
+
+    assert client.post("/predict", json=payload).status_code == 200
+
+    assert (
+        REGISTRY.get_sample_value("predict_queue_wait_seconds_count")
+        == waits_before + 1
+    )
+    # Back to zero once the response is sent; /metrics itself is not counted
+    assert REGISTRY.get_sample_value("predict_in_flight_requests") == 0
+    assert "predict_in_flight_requests 0.0" in client.get("/metrics").text
+
+
+@patch("src.api.main.model")
+def test_predict_reuses_a_nearby_trip(mock_model, payload):
+    mock_model.run.return_value = [np.array([[2.7]])]
+
+    nearby = {**payload, "pickup_latitude": 40.7488, "dropoff_latitude": 40.7815}
+    with patch("src.api.main.nearby_cache", NearbyCache(tolerance_m=100)):
+        first = client.post("/predict", json=payload)
+        second = client.post("/predict", json=nearby)
+
+    assert "X-Approximate" not in first.headers
+    assert second.headers["X-Approximate"] == "nearby"
+    assert second.json() == first.json()
+    assert mock_model.run.call_count == 1
+
+
+@patch("src.api.main.model")
+def test_predict_pins_a_model_version(mock_model, payload):
+    mock_model.run.return_value = [np.array([[2.7]])]
+    pinned = MagicMock(version="0a0b0c0d")
+    pinned.predict.return_value = (120.0, None)
+    pool = MagicMock()
+    pool.get.side_effect = lambda v: pinned if v == "0a0b0c0d" else {}[v]
+
+    with patch("src.api.main.model_pool", pool):
+        response = client.post("/predict?model_version=0a0b0c0d", json=payload)
+        assert response.status_code == 200
+        assert response.json()["predicted_duration_seconds"] == 120.0
+        mock_model.run.assert_not_called()
+
+        assert (
+            client.post("/predict?model_version=ffff0000", json=payload).status_code
+            == 404
+        )
+        assert (
+            client.post("/predict?model_version=../x", json=payload).status_code == 422
+        )
+
+
+@patch("src.api.main.model")
+def test_every_served_answer_is_observed_for_drift(mock_model, payload):
+    mock_model.run.return_value = [np.array([[2.7]])]
+    monitor = MagicMock()
+    cached_body = json.dumps({"predicted_duration_seconds": 900.0})
+    nearby = {**payload, "pickup_latitude": 40.7488, "dropoff_latitude": 40.7815}
+    hit = dict(payload, passenger_count=4)
+
+    responses = MagicMock()
+    responses.get.side_effect = lambda key, data=None: (
+        cached_body if data is not None and data.passenger_count == 4 else None
+    )
+    with patch("src.api.main.drift_monitor", monitor), patch(
+        "src.api.main.nearby_cache", NearbyCache(tolerance_m=100)
+    ), patch("src.api.main.redis_available", True), patch(
+        "src.api.main.response_cache", responses
+    ):
+        for trip in (payload, nearby, hit):
+            assert client.post("/predict", json=trip).status_code == 200
+
+    assert mock_model.run.call_count == 1
+    observed = [call.args for call in monitor.observe.call_args_list]
+    assert [record["passenger_count"] for record, _ in observed] == [1, 1, 4]
+    assert observed[0][1] == observed[1][1] == round(np.expm1(2.7), 2)
+    assert observed[2][1] == 900.0
+
+
+@pytest.fixture
+def blocked_model():
+    """A serving model whose run() blocks until `release` is set."""
+    started, release = threading.Event(), threading.Event()
+
+    def run(*_):
+        started.set()
+        release.wait(5)
+        return [np.array([[2.7]])]
+
+    with patch("src.api.main.model") as mock_model:
+        mock_model.run.side_effect = run
+        yield mock_model, started, release
+
+
+def test_followers_of_an_in_flight_key_share_without_a_slot(blocked_model, payload):
+    mock_model, started, release = blocked_model
+    limiter = AdaptiveLimiter(initial_limit=1)
+
+    with patch("src.api.main.admission", limiter), patch(
+        "src.api.main.in_flight", SingleFlight(wait_timeout=5.0)
+    ), ThreadPoolExecutor(2) as pool:
+        leader = pool.submit(client.post, "/predict", json=payload)
+        assert started.wait(5)
+        follower = pool.submit(client.post, "/predict", json=payload)
+        time.sleep(0.1)
+        assert limiter.in_flight == 1, "The follower took an admission slot."
+        release.set()
+
+        assert leader.result().status_code == 200
+        assert follower.result().status_code == 200
+    assert mock_model.run.call_count == 1
+    assert limiter.in_flight == 0
+
+
+def test_follower_that_stops_waiting_needs_a_slot(blocked_model, payload):
+    mock_model, started, release = blocked_model
+    limiter = AdaptiveLimiter(initial_limit=1)
+
+    with patch("src.api.main.admission", limiter), patch(
+        "src.api.main.in_flight", SingleFlight(wait_timeout=0.05)
+    ), ThreadPoolExecutor(1) as pool:
+        leader = pool.submit(client.post, "/predict", json=payload)
+        assert started.wait(5)
+        try:
+            # The leader holds the only slot, so the timed-out follower is shed
+            follower = client.post("/predict", json=payload)
+            assert follower.status_code == 503
+            assert mock_model.run.call_count == 1
+        finally:
+            release.set()
+        assert leader.result().status_code == 200
+    assert limiter.in_flight == 0
+
+
+# Globals the lifespan assigns; restored afterwards so other tests see a cold app
+LIFESPAN_GLOBALS = [
+    "model",
+    "input_name",
+    "fused_model",
+    "cache",
+    "redis_available",
+    "redis_lock",
+    "response_cache",
+    "nearby_cache",
+    "model_pool",
+    "shadow",
+    "drift_monitor",
+    "admission",
+    "speed_lookup",
+]
+
+
+def onnx_forest(seed: int) -> bytes:
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(200, len(FEATURES))).astype(np.float32)
+    forest = RandomForestRegressor(n_estimators=3, max_depth=4, random_state=seed)
+    forest.fit(X, rng.normal(6, 0.5, 200))
+    initial_type = [("float_input", FloatTensorType([None, len(FEATURES)]))]
+    return convert_sklearn(forest, initial_types=initial_type).SerializeToString()
+
+
+@pytest.fixture
+def registry_app(tmp_path, monkeypatch):
+    """The app started by its own lifespan, serving CURRENT of a two-version registry."""
+    registry = ModelRegistry(str(tmp_path))
+    pinned = registry.publish(onnx_forest(1), {}, activate=False)
+    serving = registry.publish(onnx_forest(2), {})
+    for name in (
+        "MODEL_VERSION",
+        "BINARY_PORT",
+        "CANDIDATE_MODEL_PATH",
+        "NEARBY_CACHE",
+    ):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("ADMISSION_CONTROL", "true")
+    monkeypatch.setenv("ADMISSION_INITIAL_LIMIT", "2")
+
+    offline = MagicMock()
+    offline.ping.side_effect = redis.ConnectionError("no redis in tests")
+    with patch.multiple(
+        main, **{name: getattr(main, name) for name in LIFESPAN_GLOBALS}
+    ), patch.object(main, "MODEL_REGISTRY_DIR", str(tmp_path)), patch(
+        "src.api.main.redis.Redis", return_value=offline
+    ):
+        with TestClient(app) as live:
+            yield live, serving, pinned
+
+
+def test_lifespan_serves_registry_versions_behind_admission(registry_app, payload):
+    live, serving, pinned = registry_app
+    assert main.response_cache.model_version == serving
+    limiter = main.admission
+    assert isinstance(limiter, AdaptiveLimiter)
+
+    current = live.post("/predict", json=payload)
+    old = live.post(f"/predict?model_version={pinned}", json=payload)
+    assert current.status_code == 200 and old.status_code == 200
+    assert (
+        current.json()["predicted_duration_seconds"]
+        != old.json()["predicted_duration_seconds"]
+    )
+    assert pinned in main.model_pool
+    assert limiter.in_flight == 0, "An admission slot leaked."
+
+    # Batch on the pinned version: mixed datetime formats, same answers as /predict
+    trips = [
+        payload,
+        dict(payload, pickup_datetime="2026-01-20T12:00"),
+        dict(payload, pickup_datetime="2026-01-20 12:00:00.500"),
+    ]
+    batch = live.post(f"/predict/batch?model_version={pinned}", json={"trips": trips})
+    assert batch.status_code == 200, batch.text
+    assert batch.json()["predicted_duration_seconds"] == pytest.approx(
+        [old.json()["predicted_duration_seconds"]] * 3, abs=0.05
+    )
+    bad = live.post(
+        "/predict/batch",
+        json={"trips": [dict(payload, pickup_datetime="20/20/2026 25:00")]},
+    )
+    assert bad.status_code == 422
+
+    # With every slot taken, the batch is turned away before touching a model
+    held = 0
+    while limiter.try_acquire():
+        held += 1
+    try:
+        shed = live.post("/predict/batch", json={"trips": trips})
+        assert shed.status_code == 503
+        assert int(shed.headers["Retry-After"]) >= 1
+    finally:
+        for _ in range(held):
+            limiter.release()
+    assert limiter.in_flight == 0
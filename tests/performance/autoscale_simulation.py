@@ -0,0 +1,220 @@
+import asyncio
+import math
+import random
+import time
+
+import aiohttp
+from prometheus_client.parser import text_string_to_metric_families
+
+# SETTINGS
+API_URL = "http://localhost:8000"
+SAMPLE_INTERVAL = 1  # seconds between /metrics scrapes
+SYNC_PERIOD = 15  # the HPA controller's default --horizontal-pod-autoscaler-sync-period
+# Load ramp: (seconds, concurrent users)
+STAGES = [
+    (30, 2),
+    (30, 16),
+    (45, 64),
+    (45, 128),
+    (45, 4),
+]
+HOT_TRIPS = 200  # repeated trips that can be served from Redis
+HOT_FRACTION = 0.3
+
+# Mirrors k8s/hpa.yaml
+MIN_REPLICAS = 1
+MAX_REPLICAS = 6
+TOLERANCE = 0.1
+SCALE_UP_PODS = 2  # per 30s
+SCALE_DOWN_WINDOW = 300
+TARGETS = {
+    "predict_in_flight_requests": 8,
+    "predict_queue_wait_p95_seconds": 0.05,
+    "predict_inference_utilization": 0.7,
+}
+
+
+def random_trip(rng: random.Random) -> dict:
+    return {
+        "passenger_count": rng.randint(1, 6),
+        "pickup_longitude": rng.uniform(-74.02, -73.93),
+        "pickup_latitude": rng.uniform(40.70, 40.80),
+        "dropoff_longitude": rng.uniform(-74.02, -73.93),
+        "dropoff_latitude": rng.uniform(40.70, 40.80),
+        "pickup_datetime": f"2016-03-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:00:00",
+    }
+
+
+async def user(session, stop_at: float, hot_trips: list, rng: random.Random):
+    """Closed-loop client: one request at a time, no think time."""
+    while time.time() < stop_at:
+        if rng.random() < HOT_FRACTION:
+            payload = rng.choice(hot_trips)
+        else:
+            payload = random_trip(rng)
+        try:
+            async with session.post(f"{API_URL}/predict", json=payload) as response:
+                await response.read()
+        except aiohttp.ClientError:
+            await asyncio.sleep(0.1)
+
+
+async def generate_load(session):
+    rng = random.Random(42)
+    hot_trips = [random_trip(rng) for _ in range(HOT_TRIPS)]
+    for seconds, users in STAGES:
+        print(f"🌊 STAGE: {users} users for {seconds}s")
+        stop_at = time.time() + seconds
+        await asyncio.gather(
+            *(
+                user(session, stop_at, hot_trips, random.Random(rng.random()))
+                for _ in range(users)
+            )
+        )
+
+
+def read_counters(text: str) -> dict:
+    """The raw series the adapter rules are built on, from one /metrics scrape."""
+    snapshot = {"buckets": {}, "in_flight": 0.0, "busy": 0.0, "hit": 0.0, "miss": 0.0}
+    for family in text_string_to_metric_families(text):
+        for sample in family.samples:
+            if sample.name == "predict_in_flight_requests":
+                snapshot["in_flight"] = sample.value
+            elif sample.name == "predict_queue_wait_seconds_bucket":
+                snapshot["buckets"][float(sample.labels["le"])] = sample.value
+            elif (
+                sample.name == "predict_stage_seconds_sum"
+                and sample.labels["stage"] == "inference"
+            ):
+                snapshot["busy"] = sample.value
+            elif sample.name == "predict_cache_requests_total":
+                snapshot[sample.labels["result"]] = sample.value
+    return snapshot
+
+
+def bucket_quantile(q: float, buckets: dict):
+    """histogram_quantile() over cumulative {le: count} deltas."""
+    bounds = sorted(buckets)
+    total = buckets[bounds[-1]] if bounds else 0
+    if total <= 0:
+        return 0.0
+    rank = q * total
+    lower, below = 0.0, 0.0
+    for bound in bounds:
+        if buckets[bound] >= rank:
+            if math.isinf(bound):
+                return lower
+            return lower + (bound - lower) * (rank - below) / (buckets[bound] - below)
+        lower, below = bound, buckets[bound]
+    return lower
+
+
+def window_signals(start: dict, end: dict, in_flight_samples: list, elapsed: float):
+    """What the adapter would report for this pod over one sync period."""
+    bucket_deltas = {
+        le: end["buckets"][le] - start["buckets"].get(le, 0) for le in end["buckets"]
+    }
+    lookups = (end["hit"] - start["hit"]) + (end["miss"] - start["miss"])
+    signals = {
+        "predict_in_flight_requests": sum(in_flight_samples) / len(in_flight_samples),
+        "predict_queue_wait_p95_seconds": bucket_quantile(0.95, bucket_deltas),
+        "predict_inference_utilization": (end["busy"] - start["busy"]) / elapsed,
+    }
+    hit_ratio = (end["hit"] - start["hit"]) / lookups if lookups else None
+    return signals, hit_ratio
+
+
+def desired_replicas(signals: dict) -> tuple:
+    """
+    The HPA proposal for the load this single pod saw: ceil(1 * value / target) per
+    metric (within TOLERANCE nothing changes), the largest one wins.
+    """
+    proposals = {}
+    for name, target in TARGETS.items():
+        ratio = signals[name] / target
+        proposals[name] = 1 if abs(ratio - 1) <= TOLERANCE else math.ceil(ratio)
+    winner = max(proposals, key=proposals.get)
+    desired = min(MAX_REPLICAS, max(MIN_REPLICAS, proposals[winner]))
+    return desired, winner
+
+
+class ReplicaTimeline:
+    """Applies the hpa.yaml behavior (scale-up rate, scale-down window) to the proposals."""
+
+    def __init__(self):
+        self.replicas = MIN_REPLICAS
+        self.history = []  # (time, desired)
+        self.last_scale_up = -math.inf
+
+    def step(self, now: float, desired: int) -> str:
+        self.history.append((now, desired))
+        if desired > self.replicas:
+            if now - self.last_scale_up < 30:
+                return "hold (scale-up rate)"
+            previous = self.replicas
+            self.replicas = min(desired, self.replicas + SCALE_UP_PODS)
+            self.last_scale_up = now
+            return f"SCALE UP {previous} -> {self.replicas}"
+        if desired < self.replicas:
+            recent = [d for t, d in self.history if now - t <= SCALE_DOWN_WINDOW]
+            target = max(recent)
+            if target < self.replicas:
+                previous = self.replicas
+                self.replicas = max(target, self.replicas - 1)
+                return f"SCALE DOWN {previous} -> {self.replicas}"
+            return "hold (scale-down window)"
+        return "steady"
+
+
+async def watch(session, done: asyncio.Event):
+    timeline = ReplicaTimeline()
+    started = time.time()
+
+    async def scrape():
+        async with session.get(f"{API_URL}/metrics") as response:
+            return read_counters(await response.text())
+
+    print(
+        f"{'t':>5} {'in_flight':>9} {'wait_p95':>9} {'util':>6} {'hit':>5} "
+        f"{'desired':>7} {'driver':<32} decision"
+    )
+    window_start, window_time, samples = await scrape(), time.time(), []
+    while not done.is_set():
+        await asyncio.sleep(SAMPLE_INTERVAL)
+        snapshot = await scrape()
+        samples.append(snapshot["in_flight"])
+        if time.time() - window_time < SYNC_PERIOD:
+            continue
+
+        now = time.time()
+        signals, hit_ratio = window_signals(
+            window_start, snapshot, samples, now - window_time
+        )
+        desired, driver = desired_replicas(signals)
+        decision = timeline.step(now - started, desired)
+        hit = f"{hit_ratio:.0%}" if hit_ratio is not None else "-"
+        print(
+            f"{now - started:5.0f} {signals['predict_in_flight_requests']:9.1f} "
+            f"{signals['predict_queue_wait_p95_seconds'] * 1000:7.1f}ms "
+            f"{signals['predict_inference_utilization']:6.2f} {hit:>5} "
+            f"{desired:7d} {driver:<32} {decision}"
+        )
+        window_start, window_time, samples = snapshot, now, []
+
+
+async def main():
+    print("🚀 AUTOSCALING SIMULATION (one local pod, HPA rules from k8s/hpa.yaml)")
+    print("-" * 100)
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        done = asyncio.Event()
+        watcher = asyncio.create_task(watch(session, done))
+        await generate_load(session)
+        # One more sync period so the cool-down shows up
+        await asyncio.sleep(SYNC_PERIOD + SAMPLE_INTERVAL)
+        done.set()
+        await watcher
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
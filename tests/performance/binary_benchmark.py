@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+import aiohttp
+import numpy as np
+import pandas as pd
+
+from src.api.binary_server import BinaryClient
+
+# SETTINGS (start the API with BINARY_PORT=9000 to enable the binary endpoint)
+REST_URL = "http://localhost:8000/predict"
+BINARY_HOST = "localhost"
+BINARY_PORT = 9000
+TOTAL_TRIPS = 2000
+CONCURRENT_LIMIT = 100
+BATCH_SIZE = 1000
+
+
+def generate_trips(n: int) -> pd.DataFrame:
+    """Random trips around Midtown, so the REST path mostly misses the cache."""
+    rng = np.random.default_rng(42)
+    start = pd.Timestamp("2016-01-01").value // 10**9
+    return pd.DataFrame(
+        {
+            "pickup_epoch": rng.integers(start, start + 180 * 86400, n),
+            "passenger_count": rng.integers(1, 7, n).astype(np.float32),
+            "pickup_longitude": -73.985 + rng.uniform(-0.05, 0.05, n),
+            "pickup_latitude": 40.748 + rng.uniform(-0.05, 0.05, n),
+            "dropoff_longitude": -73.985 + rng.uniform(-0.05, 0.05, n),
+            "dropoff_latitude": 40.748 + rng.uniform(-0.05, 0.05, n),
+        }
+    )
+
+
+async def send_rest(session, row, semaphore):
+    payload = {
+        "passenger_count": int(row.passenger_count),
+        "pickup_longitude": row.pickup_longitude,
+        "pickup_latitude": row.pickup_latitude,
+        "dropoff_longitude": row.dropoff_longitude,
+        "dropoff_latitude": row.dropoff_latitude,
+        "pickup_datetime": str(pd.Timestamp(row.pickup_epoch, unit="s")),
+    }
+    async with semaphore:
+        async with session.post(REST_URL, json=payload) as response:
+            await response.read()
+            return response.status
+
+
+async def run_rest(trips: pd.DataFrame) -> float:
+    semaphore = asyncio.Semaphore(CONCURRENT_LIMIT)
+    connector = aiohttp.TCPConnector(limit=CONCURRENT_LIMIT)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        start_time = time.perf_counter()
+        statuses = await asyncio.gather(
+            *(send_rest(session, row, semaphore) for row in trips.itertuples())
+        )
+    total_time = time.perf_counter() - start_time
+
+    failed = sum(1 for status in statuses if status != 200)
+    if failed:
+        print(f"⚠️ REST: {failed} requests failed")
+    return total_time
+
+
+def run_binary(trips: pd.DataFrame) -> float:
+    columns = {name: trips[name].to_numpy() for name in trips.columns}
+    client = BinaryClient(BINARY_HOST, BINARY_PORT)
+
+    start_time = time.perf_counter()
+    for offset in range(0, len(trips), BATCH_SIZE):
+        batch = {
+            name: values[offset : offset + BATCH_SIZE]
+            for name, values in columns.items()
+        }
+        client.predict(batch)
+    total_time = time.perf_counter() - start_time
+
+    client.close()
+    return total_time
+
+
+def main():
+    trips = generate_trips(TOTAL_TRIPS)
+    print(f"🚀 REST vs BINARY BATCH BENCHMARK ({TOTAL_TRIPS} trips)")
+    print("-" * 50)
+
+    rest_time = asyncio.run(run_rest(trips))
+    print(
+        f"🌐 REST   ({CONCURRENT_LIMIT} parallel): {rest_time:.2f} s | {TOTAL_TRIPS / rest_time:,.0f} trips/s"
+    )
+
+    binary_time = run_binary(trips)
+    print(
+        f"⚡ BINARY (batch {BATCH_SIZE}):   {binary_time:.2f} s | {TOTAL_TRIPS / binary_time:,.0f} trips/s"
+    )
+
+    print("-" * 50)
+    print(f"🏁 SPEEDUP: {rest_time / binary_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
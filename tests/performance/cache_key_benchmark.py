@@ -0,0 +1,58 @@
+import time
+
+import numpy as np
+
+from src.api.response_cache import ResponseCache, legacy_digest, trip_digest
+from src.api.schemas import TaxiInput
+
+# SETTINGS
+TOTAL_KEYS = 1_000_000
+MODEL_VERSION = "0a0b0c0d"
+
+
+def generate_trips(n: int) -> list:
+    rng = np.random.default_rng(42)
+    return [
+        TaxiInput(
+            pickup_datetime=f"2016-03-{1 + i % 28:02d} {i % 24:02d}:{i % 60:02d}:00",
+            passenger_count=int(rng.integers(1, 7)),
+            pickup_longitude=float(rng.uniform(-74.02, -73.93)),
+            pickup_latitude=float(rng.uniform(40.70, 40.80)),
+            dropoff_longitude=float(rng.uniform(-74.02, -73.93)),
+            dropoff_latitude=float(rng.uniform(40.70, 40.80)),
+        )
+        for i in range(n)
+    ]
+
+
+def measure(label: str, build, trips: list) -> float:
+    start_time = time.perf_counter()
+    keys = {build(trip) for trip in trips}
+    total_time = time.perf_counter() - start_time
+
+    rate = len(trips) / total_time
+    print(
+        f"🔑 {label:<40} {rate / 1e6:5.2f} M keys/s | "
+        f"{total_time / len(trips) * 1e9:5.0f} ns/key | {len(keys):,} unique"
+    )
+    return rate
+
+
+def main():
+    print(f"🚀 CACHE KEY BENCHMARK ({TOTAL_KEYS:,} trips)")
+    trips = generate_trips(TOTAL_KEYS)
+    print("-" * 50)
+
+    legacy = measure(
+        "legacy: json + md5 hex", lambda t: legacy_digest(t).hexdigest(), trips
+    )
+    measure("struct + xxh3_128 digest", trip_digest, trips)
+    cache = ResponseCache(None, encoding="compact", model_version=MODEL_VERSION)
+    fast = measure("ResponseCache.key (compact, versioned)", cache.key, trips)
+
+    print("-" * 50)
+    print(f"🏁 SPEEDUP: {fast / legacy:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
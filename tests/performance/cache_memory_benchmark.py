@@ -0,0 +1,86 @@
+import json
+import time
+
+import numpy as np
+import redis
+
+from src.api.inference import format_response
+from src.api.response_cache import ResponseCache
+from src.api.schemas import TaxiInput
+
+# SETTINGS (uses a scratch DB: it is FLUSHED before each run)
+REDIS_HOST = "localhost"
+REDIS_DB = 15
+TOTAL_ENTRIES = 200_000  # memory grows linearly, results are scaled to 1M
+FORMATS = [
+    ("json (legacy)", "json", False),
+    ("compact", "compact", False),
+    ("compact + cell hashes", "compact", True),
+]
+
+
+def generate_trips(n: int):
+    """Random Manhattan trips; every trip is a distinct cache entry."""
+    rng = np.random.default_rng(42)
+    columns = {
+        "passenger_count": rng.integers(1, 7, n),
+        "pickup_longitude": rng.uniform(-74.02, -73.93, n),
+        "pickup_latitude": rng.uniform(40.70, 40.80, n),
+        "dropoff_longitude": rng.uniform(-74.02, -73.93, n),
+        "dropoff_latitude": rng.uniform(40.70, 40.80, n),
+        "seconds": rng.uniform(120, 3600, n),
+    }
+    for i in range(n):
+        trip = TaxiInput(
+            pickup_datetime=f"2016-03-{1 + i % 28:02d} {i % 24:02d}:{i % 60:02d}:00",
+            passenger_count=int(columns["passenger_count"][i]),
+            pickup_longitude=float(columns["pickup_longitude"][i]),
+            pickup_latitude=float(columns["pickup_latitude"][i]),
+            dropoff_longitude=float(columns["dropoff_longitude"][i]),
+            dropoff_latitude=float(columns["dropoff_latitude"][i]),
+        )
+        yield trip, float(columns["seconds"][i])
+
+
+def used_memory(client) -> int:
+    return client.info("memory")["used_memory"]
+
+
+def measure(client, encoding: str, group_by_cell: bool) -> float:
+    """Bytes of Redis memory per million cached predictions."""
+    client.flushdb()
+    baseline = used_memory(client)
+
+    writer = ResponseCache(client, encoding=encoding, group_by_cell=group_by_cell)
+    for trip, seconds in generate_trips(TOTAL_ENTRIES):
+        body = json.dumps(format_response(seconds, None))
+        writer.set(writer.key(trip), seconds, None, body)
+
+    return (used_memory(client) - baseline) * 1_000_000 / TOTAL_ENTRIES
+
+
+def main():
+    client = redis.Redis(host=REDIS_HOST, db=REDIS_DB)
+    print(
+        f"🚀 CACHE MEMORY BENCHMARK ({TOTAL_ENTRIES:,} entries per format, scaled to 1M)"
+    )
+    print("-" * 50)
+
+    results = {}
+    for label, encoding, group_by_cell in FORMATS:
+        start_time = time.time()
+        results[label] = measure(client, encoding, group_by_cell)
+        print(
+            f"🧮 {label:<22} {results[label] / 2**20:8.1f} MB per million "
+            f"({time.time() - start_time:.0f}s)"
+        )
+
+    client.flushdb()
+    baseline = results[FORMATS[0][0]]
+    print("-" * 50)
+    for label, per_million in list(results.items())[1:]:
+        print(f"🏁 {label}: {baseline / per_million:.1f}x smaller than json")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import os
+import time
+
+import numpy as np
+import onnxruntime as rt
+import pandas as pd
+
+from src.api.binary_server import FLOAT_COLUMNS
+from src.api.inference import build_batch_feed, decode_batch_seconds, is_fused_model
+from src.api.nearby_cache import METERS_PER_DEGREE, METERS_PER_DEGREE_LON, NearbyCache
+from src.api.schemas import TaxiInput
+from src.config import MODEL_SAVE_PATH, ROOT_DIR
+
+# SETTINGS
+SAMPLE_PATH = os.path.join(ROOT_DIR, "data", "raw", "sample_data.csv")
+TOLERANCES_M = [50, 100, 200, 400]
+MAX_ENTRIES = 50_000
+# The sample has 100 distinct trips, so it is also replayed as a denser stream:
+# trips drawn with replacement, both ends moved by ~GPS noise, minutes reshuffled.
+RESAMPLED_REQUESTS = 20_000
+JITTER_M = 100
+
+
+def load_trips() -> pd.DataFrame:
+    df = pd.read_csv(
+        SAMPLE_PATH, usecols=[*FLOAT_COLUMNS, "pickup_datetime", "trip_duration"]
+    )
+    df["pickup_datetime"] = pd.to_datetime(df["pickup_datetime"])
+    return df.sort_values("pickup_datetime", ignore_index=True)
+
+
+def resample(df: pd.DataFrame, n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    out = df.iloc[rng.integers(0, len(df), n)].reset_index(drop=True)
+    for end in ("pickup", "dropoff"):
+        out[f"{end}_latitude"] += rng.normal(0, JITTER_M, n) / METERS_PER_DEGREE
+        out[f"{end}_longitude"] += rng.normal(0, JITTER_M, n) / METERS_PER_DEGREE_LON
+    minutes = pd.to_timedelta(rng.integers(0, 60, n), unit="min")
+    out["pickup_datetime"] = out["pickup_datetime"].dt.floor("h") + minutes
+    return out.sort_values("pickup_datetime", ignore_index=True)
+
+
+def model_seconds(session, df: pd.DataFrame) -> np.ndarray:
+    """Exact predictions for every row, in one session run."""
+    columns = {
+        "pickup_epoch": df["pickup_datetime"]
+        .to_numpy()
+        .astype("datetime64[s]")
+        .astype(np.int64)
+    }
+    for name in FLOAT_COLUMNS:
+        columns[name] = df[name].to_numpy(dtype=np.float32)
+    feed = build_batch_feed(
+        columns, session.get_inputs()[0].name, is_fused_model(session)
+    )
+    return decode_batch_seconds(
+        session.run(None, feed), is_fused_model(session)
+    ).astype(np.float64)
+
+
+def to_inputs(df: pd.DataFrame) -> list:
+    return [
+        TaxiInput(
+            pickup_datetime=str(row.pickup_datetime),
+            passenger_count=int(row.passenger_count),
+            pickup_longitude=row.pickup_longitude,
+            pickup_latitude=row.pickup_latitude,
+            dropoff_longitude=row.dropoff_longitude,
+            dropoff_latitude=row.dropoff_latitude,
+        )
+        for row in df.itertuples()
+    ]
+
+
+def rmsle(predicted: np.ndarray, actual: np.ndarray) -> float:
+    return float(np.sqrt(np.mean((np.log1p(predicted) - np.log1p(actual)) ** 2)))
+
+
+def replay(trips: list, exact: np.ndarray, tolerance_m: float) -> tuple:
+    """Serves the stream in order; misses run 'the model' (the precomputed answer)."""
+    index = NearbyCache(tolerance_m=tolerance_m, max_entries=MAX_ENTRIES)
+    served = exact.copy()
+    hits = np.zeros(len(trips), dtype=bool)
+    start = time.perf_counter()
+    for i, trip in enumerate(trips):
+        nearby = index.get(trip)
+        if nearby is None:
+            index.put(trip, exact[i])
+        else:
+            served[i], hits[i] = nearby[0], True
+    lookup_us = (time.perf_counter() - start) / len(trips) * 1e6
+    return served, hits, lookup_us
+
+
+def report(label: str, df: pd.DataFrame, exact: np.ndarray):
+    trips = to_inputs(df)
+    actual = df["trip_duration"].to_numpy(dtype=np.float64)
+    print(f"\n📍 {label}: {len(trips):,} requests")
+    print(
+        f"{'tolerance':>9} {'hit rate':>8} {'mean |err|':>10} {'p95 |err|':>9} "
+        f"{'rel err p50':>11} {'RMSLE served':>12} {'(exact)':>7} {'µs/req':>6}"
+    )
+    for tolerance in TOLERANCES_M:
+        served, hits, lookup_us = replay(trips, exact, tolerance)
+        error = np.abs(served[hits] - exact[hits])
+        relative = error / exact[hits]
+        mean_err = f"{error.mean():8.1f} s" if hits.any() else "       -"
+        p95_err = f"{np.percentile(error, 95):7.1f} s" if hits.any() else "      -"
+        rel_err = f"{np.median(relative):11.1%}" if hits.any() else "          -"
+        print(
+            f"{tolerance:7d} m {hits.mean():8.1%} {mean_err:>10} {p95_err:>9} {rel_err} "
+            f"{rmsle(served, actual):12.4f} {rmsle(exact, actual):7.4f} {lookup_us:6.1f}"
+        )
+
+
+def main():
+    session = rt.InferenceSession(MODEL_SAVE_PATH)
+    df = load_trips()
+    print(f"🚀 NEARBY CACHE REPLAY ({SAMPLE_PATH})")
+    print("   |err| = served - model answer for the same request, hits only")
+
+    report("As recorded", df, model_seconds(session, df))
+
+    dense = resample(df, RESAMPLED_REQUESTS)
+    report(
+        f"Resampled (±{JITTER_M} m jitter, same hour)",
+        dense,
+        model_seconds(session, dense),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from src.api.admission import AdaptiveLimiter
+from src.api.schemas import TaxiInput
+from src.components.speed_lookup import build_speed_lookup, estimate_seconds
+
+
+def run_round(limiter, latency, calls=None):
+    """Fills the limit, then completes every admitted call with `latency`."""
+    admitted = 0
+    while (calls is None or admitted < calls) and limiter.try_acquire():
+        admitted += 1
+    for _ in range(admitted):
+        limiter.release(latency)
+    return admitted
+
+
+class TestAdaptiveLimiter:
+    """
+    Unit Tests for admission control:
+    the limit must grow while latency is flat and back off when it degrades.
+    """
+
+    def test_rejects_over_the_limit(self):
+        limiter = AdaptiveLimiter(initial_limit=2)
+        assert limiter.try_acquire() and limiter.try_acquire()
+        assert not limiter.try_acquire()
+
+        limiter.release()
+        assert limiter.try_acquire()
+
+    def test_limit_grows_while_latency_is_flat(self):
+        limiter = AdaptiveLimiter(initial_limit=10)
+        for _ in range(20):
+            run_round(limiter, 0.010)
+        assert limiter.limit > 15
+
+    def test_limit_backs_off_when_latency_degrades(self):
+        limiter = AdaptiveLimiter(initial_limit=50, min_limit=2)
+        run_round(limiter, 0.010)
+        for _ in range(20):
+            run_round(limiter, 0.050)
+        assert limiter.limit == 2
+
+    def test_idle_traffic_does_not_inflate_the_limit(self):
+        limiter = AdaptiveLimiter(initial_limit=10)
+        for _ in range(100):
+            run_round(limiter, 0.010, calls=1)
+        assert limiter.limit == 10
+
+    def test_failures_back_off(self):
+        limiter = AdaptiveLimiter(initial_limit=10)
+        limiter.try_acquire()
+        limiter.release(0.010, ok=False)
+        assert limiter.limit == pytest.approx(9)
+
+
+class TestSpeedLookup:
+    """Unit Tests for the degraded-mode duration estimate."""
+
+    def test_estimate_uses_slot_speed(self):
+        hours = np.array([8, 8, 20])
+        lookup = build_speed_lookup(
+            hours, np.zeros(3), np.array([10.0, 10.0, 10.0]), np.array([3600] * 3)
+        )
+        trip = TaxiInput(
+            pickup_datetime="2016-03-14 08:10:00",  # Monday
+            passenger_count=1,
+            pickup_longitude=-73.982,
+            pickup_latitude=40.767,
+            dropoff_longitude=-73.964,
+            dropoff_latitude=40.765,
+        )
+        # 10 km/h everywhere: ~1.53 km takes ~550 s
+        assert estimate_seconds(lookup, trip) == pytest.approx(551, abs=2)
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import pytest
+from prometheus_client import REGISTRY
+
+from src.api.admission import AdaptiveLimiter
+from src.api.binary_server import BinaryClient, decode_request, encode_request, serve
+from src.api.inference import build_batch_feed
+from src.components.feature_engineering import create_features
+from src.config import FEATURES
+
+
+@pytest.fixture
+def trips():
+    return pd.DataFrame(
+        {
+            "pickup_datetime": [
+                "2016-03-14 17:24:55",
+                "2016-06-12 00:43:35",
+                "2016-01-19 11:35:24",
+            ],
+            "passenger_count": [1, 2, 6],
+            "pickup_longitude": [-73.982, -73.980, -73.979],
+            "pickup_latitude": [40.767, 40.738, 40.763],
+            "dropoff_longitude": [-73.964, -73.999, -74.005],
+            "dropoff_latitude": [40.765, 40.731, 40.710],
+        }
+    )
+
+
+def to_columns(df: pd.DataFrame) -> dict:
+    epoch = pd.to_datetime(df["pickup_datetime"]).astype("int64") // 10**9
+    columns = {"pickup_epoch": epoch.to_numpy()}
+    for name in df.columns.drop("pickup_datetime"):
+        columns[name] = df[name].to_numpy(np.float32)
+    return columns
+
+
+@contextmanager
+def running_server(predict_columns, **kwargs):
+    """Serves on an ephemeral loopback port from a background event loop."""
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(serve(predict_columns, "127.0.0.1", 0, **kwargs))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.sockets[0].getsockname()[1]
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        server.close()
+        loop.run_until_complete(server.wait_closed())
+        loop.close()
+
+
+class TestBinaryProtocol:
+    """
+    Unit Tests for the columnar binary batch endpoint:
+    lossless framing and the same features as the REST path.
+    """
+
+    def test_request_round_trip(self, trips):
+        columns = to_columns(trips)
+        frame = encode_request(columns)
+        decoded = decode_request(frame[4:])
+
+        for name, values in columns.items():
+            np.testing.assert_array_equal(decoded[name], values)
+
+    def test_truncated_payload_is_rejected(self, trips):
+        frame = encode_request(to_columns(trips))
+        with pytest.raises(ValueError):
+            decode_request(frame[4:-1])
+
+    def test_batch_features_match_create_features(self, trips):
+        X = build_batch_feed(to_columns(trips), "float_input", fused=False)[
+            "float_input"
+        ]
+        expected = create_features(trips)[FEATURES].to_numpy(np.float32)
+        # Coordinates travel as float32 (~1 m), so distances agree to ~0.1%.
+        np.testing.assert_allclose(X, expected, rtol=1e-3)
+
+    def test_client_server_round_trip(self, trips):
+        with running_server(lambda columns: columns["passenger_count"] * 2) as port:
+            client = BinaryClient("127.0.0.1", port)
+            first = client.predict(to_columns(trips))
+            second = client.predict(to_columns(trips.head(1)))
+            client.close()
+
+        np.testing.assert_array_equal(first, [2, 4, 12])
+        np.testing.assert_array_equal(second, [2])
+
+    def test_frames_are_admitted_and_counted_like_predict(self, trips):
+        limiter = AdaptiveLimiter(initial_limit=1, min_limit=1)
+        waits_before = REGISTRY.get_sample_value("predict_queue_wait_seconds_count")
+        idle = REGISTRY.get_sample_value("predict_in_flight_requests")
+        in_flight = []
+
+        def predict_columns(columns):
+            in_flight.append(REGISTRY.get_sample_value("predict_in_flight_requests"))
+            return columns["passenger_count"]
+
+        with running_server(predict_columns, limiter=limiter) as port:
+            client = BinaryClient("127.0.0.1", port)
+            np.testing.assert_array_equal(client.predict(to_columns(trips)), [1, 2, 6])
+            assert limiter.in_flight == 0, "The admission slot was not released."
+
+            assert limiter.try_acquire()  # the API holds the only slot
+            with pytest.raises(RuntimeError, match="overloaded"):
+                client.predict(to_columns(trips))
+            limiter.release()
+            client.close()
+
+        assert in_flight == [idle + 1]
+        assert REGISTRY.get_sample_value("predict_in_flight_requests") == idle
+        waits_after = REGISTRY.get_sample_value("predict_queue_wait_seconds_count")
+        assert waits_after - (waits_before or 0) == 2
@@ -0,0 +1,67 @@
+import threading
+import time
+
+import pytest
+
+from src.api.coalescing import SingleFlight
+
+
+class TestSingleFlight:
+    """
+    Unit Tests for request coalescing:
+    concurrent callers of the same key must share a single execution.
+    """
+
+    def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        calls = []
+        results = []
+
+        def slow_inference():
+            calls.append(1)
+            time.sleep(0.1)
+            return "42.0"
+
+        def worker():
+            results.append(flight.do("trip", slow_inference))
+
+        threads = [threading.Thread(target=worker) for _ in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1, "The model ran more than once for the same key."
+        assert all(result == "42.0" for result, _ in results)
+        assert sum(1 for _, shared in results if not shared) == 1
+
+    def test_error_is_propagated_and_key_released(self):
+        flight = SingleFlight()
+
+        def broken():
+            raise ValueError("model failure")
+
+        with pytest.raises(ValueError):
+            flight.do("trip", broken)
+
+        # The failed call must not stay registered.
+        assert flight.do("trip", lambda: "ok") == ("ok", False)
+
+    def test_follower_falls_back_when_the_leader_hangs(self):
+        flight = SingleFlight(wait_timeout=0.05)
+        release = threading.Event()
+
+        leader = threading.Thread(
+            target=flight.do, args=("trip", lambda: release.wait(5) and "late")
+        )
+        leader.start()
+        while not flight.in_progress("trip"):
+            time.sleep(0.001)
+
+        start = time.perf_counter()
+        assert flight.do("trip", lambda: "own") == ("own", False)
+        assert time.perf_counter() - start < 1
+
+        release.set()
+        leader.join()
+        assert not flight.in_progress("trip")
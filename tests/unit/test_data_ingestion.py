@@ -0,0 +1,125 @@
+import os
+import zipfile
+
+import pandas as pd
+import pytest
+
+from src.components.data_ingestion import clean_trips
+from src.utils.data_fetch import extract_member, fetch_dataset, file_sha256, is_verified
+
+
+class TestCleanTrips:
+    """
+    Unit Tests for the single-mask cleaning stage.
+    Every rule is checked on its own row so the per-rule drop counts can be verified.
+    """
+
+    @pytest.fixture
+    def raw_trips(self):
+        base = {
+            "pickup_datetime": "2016-03-14 17:24:55",
+            "passenger_count": 1,
+            "pickup_longitude": -73.9857,
+            "pickup_latitude": 40.7484,
+            "dropoff_longitude": -73.9665,
+            "dropoff_latitude": 40.7812,
+            "trip_duration": 900,
+        }
+        rows = [
+            dict(base),  # valid
+            dict(base, trip_duration=30),  # too short
+            dict(base, pickup_longitude=-75.0),  # outside NYC
+            dict(base, dropoff_longitude=-73.9857, dropoff_latitude=40.7484),  # 0 kph
+        ]
+        return pd.DataFrame(rows)
+
+    def test_only_valid_rows_survive(self, raw_trips):
+        cleaned, _ = clean_trips(raw_trips)
+        assert list(cleaned.index) == [0], "An invalid trip survived the cleaning."
+
+    def test_drop_counts_per_rule(self, raw_trips):
+        _, drop_counts = clean_trips(raw_trips)
+
+        assert drop_counts["dropped_duration"] == 1
+        assert drop_counts["dropped_bounds"] == 1
+        # Rules overlap: the 30s trip and the out-of-bounds pickup are also too fast.
+        assert drop_counts["dropped_speed"] == 3
+        assert drop_counts["dropped_total"] == 3
+
+
+class TestFetchDataset:
+    """
+    Unit Tests for the verified data-fetch layer (no network: the archive is pre-seeded in the cache).
+    """
+
+    CSV = b"id,trip_duration\nid1,455\n"
+
+    @pytest.fixture
+    def cache_dir(self, tmp_path):
+        cache = tmp_path / "cache"
+        cache.mkdir()
+        with zipfile.ZipFile(cache / "drive-id.zip", "w") as zf:
+            zf.writestr("train.csv", self.CSV)
+        return cache
+
+    def test_extracts_verifies_and_publishes_to_mirror(self, tmp_path, cache_dir):
+        target = tmp_path / "raw" / "train.csv"
+
+        fetch_dataset(str(target), "drive-id", cache_dir=str(cache_dir))
+
+        assert target.read_bytes() == self.CSV
+        assert is_verified(str(target), file_sha256(str(target)))
+        assert not (cache_dir / "drive-id.zip").exists(), "The archive was kept."
+        assert (cache_dir / "train.csv").read_bytes() == self.CSV
+
+    def test_truncated_file_is_replaced(self, tmp_path, cache_dir):
+        target = tmp_path / "raw" / "train.csv"
+        fetch_dataset(str(target), "drive-id", cache_dir=str(cache_dir))
+
+        # Simulate a half-written file left behind by an older version.
+        target.write_bytes(self.CSV[:5])
+        assert not is_verified(str(target))
+
+        fetch_dataset(str(target), "drive-id", cache_dir=str(cache_dir))
+        assert target.read_bytes() == self.CSV
+
+    def test_checksum_mismatch_is_rejected(self, tmp_path, cache_dir):
+        target = tmp_path / "raw" / "train.csv"
+
+        with pytest.raises(ValueError):
+            fetch_dataset(
+                str(target),
+                "drive-id",
+                cache_dir=str(cache_dir),
+                expected_sha256="0" * 64,
+            )
+        assert not os.path.exists(target)
+        assert not os.path.exists(f"{target}.tmp")
+        assert not (cache_dir / "drive-id.zip").exists()
+
+    def test_mismatched_member_never_replaces_the_target(self, tmp_path, cache_dir):
+        target = tmp_path / "train.csv"
+        target.write_bytes(b"previous")
+
+        with pytest.raises(ValueError):
+            extract_member(
+                str(cache_dir / "drive-id.zip"), "train.csv", str(target), "0" * 64
+            )
+        assert target.read_bytes() == b"previous"
+        assert not os.path.exists(f"{target}.sha256")
+
+    def test_file_without_sidecar_is_rehashed_or_refetched(self, tmp_path, cache_dir):
+        target = tmp_path / "raw" / "train.csv"
+        target.parent.mkdir()
+
+        # No sidecar, nothing pinned: not trusted, so a fresh copy is fetched.
+        target.write_bytes(b"id,trip_duration\nid1,999\n")
+        assert not is_verified(str(target))
+        fetch_dataset(str(target), "drive-id", cache_dir=str(cache_dir))
+        assert target.read_bytes() == self.CSV
+
+        # No sidecar, but a pinned hash: re-hashed and accepted without a fetch.
+        pinned = file_sha256(str(target))
+        os.remove(f"{target}.sha256")
+        assert is_verified(str(target), pinned)
+        assert os.path.exists(f"{target}.sha256")
@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.api.drift import DriftMonitor
+from src.components.drift import bin_counts, build_reference, psi
+from src.components.feature_engineering import create_features
+from src.config import FEATURES
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+SAMPLE_PATH = os.path.join(PROJECT_ROOT, "data", "raw", "sample_data.csv")
+RAW_FIELDS = [
+    "pickup_datetime",
+    "passenger_count",
+    "pickup_longitude",
+    "pickup_latitude",
+    "dropoff_longitude",
+    "dropoff_latitude",
+]
+
+
+@pytest.fixture(scope="module")
+def trips():
+    return pd.read_csv(SAMPLE_PATH)
+
+
+@pytest.fixture(scope="module")
+def reference(trips):
+    df = create_features(trips)
+    columns = {name: df[name].to_numpy() for name in FEATURES}
+    columns["prediction"] = df["trip_duration"].to_numpy()
+    return build_reference(columns)
+
+
+class TestDriftSketches:
+    """
+    Unit Tests for the drift monitor: PSI is ~0 for the training distribution
+    and large when live traffic shifts.
+    """
+
+    def test_psi_bounds(self):
+        values = np.random.default_rng(0).normal(size=5000)
+        edges = np.quantile(values, np.linspace(0, 1, 11)[1:-1])
+        same = bin_counts(values, edges)
+        shifted = bin_counts(values + 2, edges)
+
+        assert psi(same, same) == pytest.approx(0.0)
+        assert psi(same, shifted) > 0.25
+
+    def test_monitor_tracks_shift(self, trips, reference):
+        monitor = DriftMonitor(reference)
+        for record, duration in zip(
+            trips[RAW_FIELDS].to_dict("records"), trips["trip_duration"]
+        ):
+            monitor.observe(record, float(duration))
+        baseline = monitor.flush()
+        assert set(baseline) == set(FEATURES) | {"prediction"}
+        assert baseline["hour"] < 0.1
+
+        # Every trip now at 3 AM with 3x longer predictions
+        shifted = DriftMonitor(reference)
+        for record, duration in zip(
+            trips[RAW_FIELDS].to_dict("records"), trips["trip_duration"]
+        ):
+            record = dict(record, pickup_datetime="2016-03-14 03:00:00")
+            shifted.observe(record, float(duration) * 3)
+        scores = shifted.flush()
+        assert scores["hour"] > 0.25
+        assert scores["prediction"] > 0.25
+
+    def test_mixed_datetime_formats_do_not_drop_the_window(self, trips, reference):
+        monitor = DriftMonitor(reference)
+        records = trips[RAW_FIELDS].head(4).to_dict("records")
+        records[1]["pickup_datetime"] = "2016-03-14T17:24"
+        records[2]["pickup_datetime"] = "2016-03-14 17:24:55.123"
+        records[3]["pickup_datetime"] = "not a date"
+        for record in records:
+            monitor.observe(record, 600.0)
+
+        scores = monitor.flush()
+
+        assert set(scores) == set(FEATURES) | {"prediction"}
+        assert monitor.counts["hour"].sum() == pytest.approx(3)
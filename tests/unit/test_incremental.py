@@ -0,0 +1,160 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from src.config import FEATURES, REFRESH_NEW_TREES
+from src.pipelines.incremental_pipeline import (
+    refresh_forest,
+    sample_history,
+    scan_partitions,
+    should_promote,
+    split_holdout,
+)
+
+
+@pytest.fixture
+def rows():
+    rng = np.random.default_rng(42)
+    X = rng.random((120, len(FEATURES))).astype(np.float32)
+    y = X[:, 0] * 2 + rng.normal(0, 0.05, len(X))
+    return X, y
+
+
+class TestRefreshForest:
+    """
+    Unit Tests for the warm-start refresh: new trees are appended, the forest stays bounded
+    and the live model is never modified in place.
+    """
+
+    def test_appends_trees_without_touching_live_forest(self, rows):
+        X, y = rows
+        forest = RandomForestRegressor(n_estimators=5, max_depth=4, random_state=42)
+        forest.fit(pd.DataFrame(X[:80], columns=FEATURES), y[:80])
+
+        candidate = refresh_forest(
+            forest, X[80:], y[80:], X[:80], y[:80], np.random.default_rng(0)
+        )
+
+        assert len(forest.estimators_) == 5, "The live forest was modified."
+        assert len(candidate.estimators_) == 5 + REFRESH_NEW_TREES
+        for kept, original in zip(candidate.estimators_[:5], forest.estimators_):
+            np.testing.assert_array_equal(kept.predict(X), original.predict(X))
+
+    def test_only_refresh_trees_are_dropped_beyond_cap(self, rows, monkeypatch):
+        X, y = rows
+        monkeypatch.setattr(
+            "src.pipelines.incremental_pipeline.REFRESH_MAX_TREES", REFRESH_NEW_TREES
+        )
+        forest = RandomForestRegressor(n_estimators=5, max_depth=2, random_state=42)
+        forest.fit(pd.DataFrame(X, columns=FEATURES), y)
+
+        first = refresh_forest(forest, X, y, X[:0], y[:0], np.random.default_rng(0))
+        second = refresh_forest(first, X, y, X[:0], y[:0], np.random.default_rng(1))
+
+        assert len(second.estimators_) == 5 + REFRESH_NEW_TREES
+        assert second.n_estimators == 5 + REFRESH_NEW_TREES
+        assert second.n_base_estimators_ == 5
+        for kept, base in zip(second.estimators_[:5], forest.estimators_):
+            np.testing.assert_array_equal(kept.predict(X), base.predict(X))
+        assert not any(
+            tree is old for tree in second.estimators_ for old in first.estimators_[5:]
+        ), "The first refresh's trees outlived the cap instead of the base trees."
+
+
+class TestPartitionScan:
+    """
+    Unit Tests for partition discovery: seen partitions are recognised by their stamp
+    (size, mtime) without being hashed, and only content changes make a partition new.
+    """
+
+    @pytest.fixture
+    def hashed(self, monkeypatch):
+        calls = []
+
+        def fake_sha256(path):
+            calls.append(os.path.basename(path))
+            with open(path, "rb") as f:
+                return f.read().hex()
+
+        monkeypatch.setattr(
+            "src.pipelines.incremental_pipeline.file_sha256", fake_sha256
+        )
+        return calls
+
+    def test_seen_partitions_are_not_rehashed(self, tmp_path, hashed):
+        paths = []
+        for day in ("01", "02"):
+            path = tmp_path / f"2026-01-{day}.csv"
+            path.write_bytes(day.encode())
+            paths.append(str(path))
+        seen = {}
+
+        new, old = scan_partitions(paths, seen)
+        assert sorted(new) == paths and old == []
+        for path, sha256 in new.items():
+            stat = os.stat(path)
+            seen[os.path.basename(path)] = {
+                "sha256": sha256,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+            }
+        hashed.clear()
+
+        assert scan_partitions(paths, seen) == ({}, paths)
+        assert hashed == [], "A seen partition was read again."
+
+        # Touched but identical: hashed once, re-stamped, still old
+        os.utime(paths[0], ns=(0, 0))
+        assert scan_partitions(paths, seen) == ({}, paths)
+        assert hashed == ["2026-01-01.csv"]
+        assert seen["2026-01-01.csv"]["mtime_ns"] == 0
+
+        with open(paths[1], "wb") as f:
+            f.write(b"changed")
+        new, old = scan_partitions(paths, seen)
+        assert list(new) == [paths[1]] and old == [paths[0]]
+
+    def test_history_is_sampled_not_loaded_whole(self, tmp_path, monkeypatch):
+        loaded = []
+
+        def fake_features(path, sha256):
+            loaded.append(path)
+            return np.zeros((10, len(FEATURES)), np.float32), np.zeros(10), None
+
+        monkeypatch.setattr(
+            "src.pipelines.incremental_pipeline.partition_features", fake_features
+        )
+        old = [f"{day:02d}.csv" for day in range(1, 31)]
+        seen = {name: {"sha256": name} for name in old}
+
+        X, y = sample_history(old, seen, 25, np.random.default_rng(0))
+
+        assert len(loaded) == 3
+        assert X.shape == (30, len(FEATURES)) and len(y) == 30
+
+
+class TestPromotionGate:
+    """
+    Unit Tests for the promotion inputs: the holdout is the newest slice by pickup time,
+    and a candidate that regresses on replayed history is not promoted.
+    """
+
+    def test_holdout_is_newest_by_pickup_time_not_file_order(self, rows):
+        X, y = rows
+        t = np.random.default_rng(0).permutation(len(y)).astype(np.int64)
+
+        (X_train, _), (X_holdout, y_holdout) = split_holdout(X, y, t, 0.25)
+
+        newest = np.argsort(t)[-30:]
+        np.testing.assert_array_equal(X_holdout, X[newest])
+        np.testing.assert_array_equal(y_holdout, y[newest])
+        assert len(X_train) == 90
+
+    def test_history_regression_blocks_promotion(self):
+        assert should_promote((0.50, 0.40), (0.30, 0.30), tolerance=0.01)
+        assert should_promote((0.50, 0.40), None, tolerance=0.01)
+        assert not should_promote((0.50, 0.40), (0.30, 0.35), tolerance=0.01)
+        assert not should_promote((0.40, 0.40), (0.30, 0.20), tolerance=0.01)
@@ -0,0 +1,133 @@
+import os
+
+import numpy as np
+import pytest
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import FloatTensorType
+from sklearn.ensemble import RandomForestRegressor
+
+from src.api.model_pool import ModelPool
+from src.api.schemas import TaxiInput
+from src.components.model_registry import ModelRegistry, content_version, publish_model
+from src.config import FEATURES
+
+TRIP = TaxiInput(
+    pickup_datetime="2016-03-14 17:24:55",
+    passenger_count=1,
+    pickup_longitude=-73.9822,
+    pickup_latitude=40.7679,
+    dropoff_longitude=-73.9646,
+    dropoff_latitude=40.7656,
+)
+
+
+def forest_model(seed: int):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(200, len(FEATURES))).astype(np.float32)
+    model = RandomForestRegressor(n_estimators=3, max_depth=4, random_state=seed)
+    model.fit(X, rng.normal(6, 0.5, 200))
+    initial_type = [("float_input", FloatTensorType([None, len(FEATURES)]))]
+    return convert_sklearn(model, initial_types=initial_type), X
+
+
+@pytest.fixture(scope="module")
+def models():
+    return [forest_model(seed) for seed in (1, 2, 3)]
+
+
+class TestModelRegistry:
+    """
+    Unit Tests for the model artifact registry:
+    content-addressed versions, atomic publishing and verified loads.
+    """
+
+    def test_publish_is_content_addressed_and_idempotent(self, tmp_path, models):
+        registry = ModelRegistry(str(tmp_path))
+        onnx_model, X = models[0]
+
+        version = publish_model(registry, onnx_model, X, metrics={"rmse": 0.4})
+        assert version == content_version(onnx_model.SerializeToString())
+        assert publish_model(registry, onnx_model, X) == version
+        assert registry.versions() == [version]
+        assert registry.current() == version
+        # Nothing but the version directory and the CURRENT pointer is left behind
+        assert sorted(os.listdir(tmp_path)) == sorted([version, "CURRENT"])
+
+    def test_manifest_records_features_opset_and_benchmark(self, tmp_path, models):
+        registry = ModelRegistry(str(tmp_path))
+        onnx_model, X = models[0]
+        manifest = registry.manifest(
+            publish_model(registry, onnx_model, X, metrics={"rmse": 0.4})
+        )
+
+        assert manifest["features"] == FEATURES
+        assert manifest["opsets"]["ai.onnx.ml"] >= 1
+        assert manifest["benchmark"]["single_row_p50_ms"] > 0
+        assert manifest["metrics"] == {"rmse": 0.4}
+        assert manifest["size_bytes"] == len(onnx_model.SerializeToString())
+
+    def test_load_refuses_a_damaged_model(self, tmp_path, models):
+        registry = ModelRegistry(str(tmp_path))
+        version = registry.publish(models[0][0].SerializeToString(), {})
+        model_path = tmp_path / version / "model.onnx"
+        model_path.write_bytes(model_path.read_bytes()[:100])
+
+        with pytest.raises(ValueError):
+            registry.load_bytes(version)
+
+    def test_activate_and_unknown_versions(self, tmp_path, models):
+        registry = ModelRegistry(str(tmp_path))
+        first = registry.publish(models[0][0].SerializeToString(), {})
+        registry.publish(models[1][0].SerializeToString(), {})
+
+        registry.activate(first)
+        assert registry.current() == first
+        for bad in ("0000ffff", "../../etc", first + "\n"):
+            with pytest.raises(KeyError):
+                registry.activate(bad)
+
+    def test_prune_keeps_newest_current_and_pinned(self, tmp_path, models):
+        registry = ModelRegistry(str(tmp_path))
+        versions = [
+            registry.publish(onnx_model.SerializeToString(), {}, activate=False)
+            for onnx_model, _ in models
+        ]
+        registry.activate(versions[0])
+
+        assert registry.prune(keep=1, pinned=[versions[1]]) == []
+        assert registry.prune(keep=1) == [versions[1]]
+        assert registry.versions() == [versions[0], versions[2]]
+        assert sorted(os.listdir(tmp_path)) == sorted(["CURRENT", *registry.versions()])
+        with pytest.raises(ValueError):
+            registry.prune(keep=0)
+
+
+class TestModelPool:
+    """
+    Unit Tests for lazily loaded model versions:
+    one load per version, bounded by an LRU.
+    """
+
+    def test_loads_lazily_and_evicts_least_recently_used(self, tmp_path, models):
+        registry = ModelRegistry(str(tmp_path))
+        versions = [
+            registry.publish(onnx_model.SerializeToString(), {})
+            for onnx_model, _ in models
+        ]
+        pool = ModelPool(registry, max_loaded=2)
+        assert versions[0] not in pool
+
+        first = pool.get(versions[0])
+        assert first.version == versions[0]
+        assert pool.get(versions[0]) is first  # no reload
+        seconds, _ = first.predict(TRIP)
+        assert seconds > 0
+
+        pool.get(versions[1])
+        pool.get(versions[0])  # most recently used again
+        pool.get(versions[2])
+        assert versions[0] in pool and versions[2] in pool
+        assert versions[1] not in pool
+
+        with pytest.raises(KeyError):
+            pool.get("0000ffff")
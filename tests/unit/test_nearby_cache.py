@@ -0,0 +1,83 @@
+import pytest
+
+from src.api.nearby_cache import NearbyCache
+from src.api.schemas import TaxiInput
+
+# ~0.0009° of latitude is 100 m
+TRIP = dict(
+    pickup_datetime="2016-03-14 17:24:55",  # Monday
+    passenger_count=1,
+    pickup_longitude=-73.9822,
+    pickup_latitude=40.7679,
+    dropoff_longitude=-73.9646,
+    dropoff_latitude=40.7656,
+)
+
+
+def trip(**changes) -> TaxiInput:
+    return TaxiInput(**{**TRIP, **changes})
+
+
+class TestNearbyCache:
+    """
+    Unit Tests for the nearby-trip index:
+    reuse only within the distance tolerance and time slot, with bounded memory.
+    """
+
+    def test_reuses_a_trip_within_tolerance(self):
+        index = NearbyCache(tolerance_m=150)
+        index.put(trip(), 455.0, [300.0, 600.0])
+
+        # 100 m north at pickup and dropoff, same hour a few minutes later
+        nearby = trip(
+            pickup_datetime="2016-03-14 17:50:00",
+            pickup_latitude=TRIP["pickup_latitude"] + 0.0009,
+            dropoff_latitude=TRIP["dropoff_latitude"] + 0.0009,
+        )
+        assert index.get(nearby) == (455.0, [300.0, 600.0])
+
+    def test_misses_outside_tolerance_or_slot(self):
+        index = NearbyCache(tolerance_m=150)
+        index.put(trip(), 455.0)
+
+        assert (
+            index.get(trip(dropoff_latitude=TRIP["dropoff_latitude"] + 0.002)) is None
+        )
+        assert index.get(trip(pickup_datetime="2016-03-14 18:05:00")) is None
+        assert index.get(trip(pickup_datetime="2016-03-15 17:24:55")) is None
+
+    def test_returns_the_closest_match(self):
+        index = NearbyCache(tolerance_m=300)
+        index.put(trip(pickup_latitude=TRIP["pickup_latitude"] + 0.002), 100.0)
+        index.put(trip(pickup_latitude=TRIP["pickup_latitude"] + 0.0005), 200.0)
+
+        assert index.get(trip())[0] == 200.0
+
+    def test_eviction_is_bounded_and_lru(self):
+        index = NearbyCache(tolerance_m=50, max_entries=2)
+        first = trip(pickup_longitude=-73.90)
+        second = trip(pickup_longitude=-73.91)
+        third = trip(pickup_longitude=-73.92)
+
+        index.put(first, 1.0)
+        index.put(second, 2.0)
+        assert index.get(first)  # first becomes the most recently used
+        index.put(third, 3.0)
+
+        assert len(index) == 2
+        assert index.get(second) is None
+        assert index.get(first) and index.get(third)
+
+    def test_bucket_size_caps_a_dense_cell(self):
+        index = NearbyCache(tolerance_m=150, bucket_size=3)
+        for i in range(10):
+            index.put(trip(), float(i))
+
+        assert len(index) == 3
+        assert index.get(trip())[0] in (7.0, 8.0, 9.0)
+
+    def test_rejects_bad_settings(self):
+        with pytest.raises(ValueError):
+            NearbyCache(tolerance_m=0)
+        with pytest.raises(ValueError):
+            NearbyCache(max_entries=0)
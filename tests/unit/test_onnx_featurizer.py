@@ -0,0 +1,57 @@
+import os
+
+import numpy as np
+import onnxruntime as ort
+import pandas as pd
+import pytest
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import FloatTensorType
+from sklearn.ensemble import RandomForestRegressor
+
+from src.components.feature_engineering import create_features
+from src.components.onnx_featurizer import FUSED_OUTPUTS, RAW_INPUTS, build_fused_model
+from src.config import FEATURES
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+SAMPLE_PATH = os.path.join(PROJECT_ROOT, "data", "raw", "sample_data.csv")
+
+
+@pytest.fixture(scope="module")
+def trips():
+    df = pd.read_csv(SAMPLE_PATH)
+    # Same pickup and dropoff: bearing hits the atan2(0, 0) edge case.
+    df.loc[0, ["dropoff_longitude", "dropoff_latitude"]] = df.loc[
+        0, ["pickup_longitude", "pickup_latitude"]
+    ].to_numpy()
+    return create_features(df)
+
+
+@pytest.fixture(scope="module")
+def onnx_model(trips):
+    X = trips[FEATURES].astype(np.float32)
+    model = RandomForestRegressor(n_estimators=5, max_depth=6, random_state=42)
+    model.fit(X, np.log1p(trips["trip_duration"]))
+    initial_type = [("float_input", FloatTensorType([None, len(FEATURES)]))]
+    return convert_sklearn(model, initial_types=initial_type)
+
+
+class TestFusedModel:
+    """
+    Unit Tests for the fused ONNX export:
+    the in-graph feature engineering must reproduce create_features + expm1.
+    """
+
+    def test_matches_python_featurization(self, trips, onnx_model):
+        X = trips[FEATURES].astype(np.float32).to_numpy()
+        standard = ort.InferenceSession(onnx_model.SerializeToString())
+        expected = np.expm1(standard.run(None, {"float_input": X})[0])
+
+        fused = ort.InferenceSession(build_fused_model(onnx_model).SerializeToString())
+        feed = {
+            name: trips[name].astype(np.float32).to_numpy().reshape(-1, 1)
+            for name in RAW_INPUTS
+        }
+        seconds, minutes = fused.run(FUSED_OUTPUTS, feed)
+
+        np.testing.assert_allclose(seconds, expected, rtol=1e-4)
+        np.testing.assert_allclose(minutes, expected / 60, rtol=1e-4)
@@ -0,0 +1,43 @@
+import numpy as np
+import onnxruntime as ort
+import pytest
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import FloatTensorType
+from sklearn.ensemble import RandomForestRegressor
+
+from src.components.onnx_quantiles import build_quantile_model
+
+QUANTILES = (0.1, 0.9)
+
+
+@pytest.fixture(scope="module")
+def forest():
+    rng = np.random.default_rng(42)
+    X = rng.random((200, 4)).astype(np.float32)
+    y = X @ np.array([1.0, 2.0, -1.0, 0.5]) + rng.normal(0, 0.1, 200)
+    return RandomForestRegressor(n_estimators=11, max_depth=5, random_state=42).fit(
+        X, y
+    )
+
+
+class TestQuantileModel:
+    """
+    Unit Tests for the quantile export:
+    one model.run must return the forest mean and the quantiles of the per-tree predictions.
+    """
+
+    def test_mean_and_quantiles_match_sklearn(self, forest):
+        initial_type = [("float_input", FloatTensorType([None, 4]))]
+        onnx_model = build_quantile_model(
+            convert_sklearn(forest, initial_types=initial_type), QUANTILES
+        )
+        session = ort.InferenceSession(onnx_model.SerializeToString())
+
+        X = np.random.default_rng(0).random((20, 4)).astype(np.float32)
+        mean, quantiles = session.run(None, {"float_input": X})
+
+        per_tree = np.stack([tree.predict(X) for tree in forest.estimators_], axis=1)
+        np.testing.assert_allclose(mean.ravel(), forest.predict(X), rtol=1e-5)
+        np.testing.assert_allclose(
+            quantiles, np.quantile(per_tree, QUANTILES, axis=1).T, rtol=1e-5
+        )
@@ -0,0 +1,191 @@
+import json
+
+import pytest
+
+from src.api.inference import format_response
+from src.api.response_cache import ResponseCache, decode_value, encode_value
+from src.api.schemas import TaxiInput
+
+
+class FakeRedis:
+    """The handful of Redis commands the cache uses, backed by dicts."""
+
+    def __init__(self):
+        self.store = {}
+        self.ttls = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value.encode() if isinstance(value, str) else value
+        self.ttls[key] = ttl
+
+    def hget(self, name, field):
+        return self.store.get(name, {}).get(field)
+
+    def hset(self, name, field, value):
+        self.store.setdefault(name, {})[field] = value
+
+    def hlen(self, name):
+        return len(self.store.get(name, {}))
+
+    def hdel(self, name, field):
+        self.store.get(name, {}).pop(field, None)
+
+    def expire(self, name, ttl, nx=False):
+        if not (nx and name in self.ttls):
+            self.ttls[name] = ttl
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Queues commands and runs them against the FakeRedis on execute()."""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, command):
+        return lambda *args, **kwargs: self.calls.append((command, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.client, c)(*a, **kw) for c, a, kw in self.calls]
+
+
+@pytest.fixture
+def trip():
+    return TaxiInput(
+        pickup_datetime="2016-03-14 17:24:55",
+        passenger_count=1,
+        pickup_longitude=-73.982,
+        pickup_latitude=40.767,
+        dropoff_longitude=-73.964,
+        dropoff_latitude=40.765,
+    )
+
+
+class TestResponseCache:
+    """
+    Unit Tests for the cache encodings:
+    every format must round-trip to the same JSON body the API would send.
+    """
+
+    def test_compact_value_is_four_bytes(self):
+        assert len(encode_value(858.04, None)) == 4
+        assert len(encode_value(858.04, [600.0, 1200.0])) == 12
+
+    def test_compact_value_decodes_to_response(self):
+        body = json.loads(decode_value(encode_value(858.04, [600.0, 1200.0])))
+        assert body == format_response(858.04, [600.0, 1200.0])
+
+    @pytest.mark.parametrize(
+        "encoding, group_by_cell",
+        [("json", False), ("compact", False), ("compact", True)],
+    )
+    def test_round_trip(self, trip, encoding, group_by_cell):
+        client = FakeRedis()
+        cache = ResponseCache(client, encoding=encoding, group_by_cell=group_by_cell)
+        key = cache.key(trip)
+        body = json.dumps(format_response(858.04, None))
+
+        assert cache.get(key) is None
+        cache.set(key, 858.04, None, body)
+        assert json.loads(cache.get(key)) == json.loads(body)
+        assert set(client.ttls.values()) == {3600}
+
+    def test_compact_keys_are_binary_and_short(self, trip):
+        assert len(ResponseCache(None).key(trip)) == 32
+        assert len(ResponseCache(None, encoding="compact").key(trip)) == 16
+
+    def test_grouped_keys_share_a_hash_per_cell(self, trip):
+        client = FakeRedis()
+        cache = ResponseCache(
+            client, encoding="compact", group_by_cell=True, cell_buckets=1
+        )
+        nearby = trip.model_copy(update={"passenger_count": 2})
+
+        for data in (trip, nearby):
+            cache.set(cache.key(data), 858.04, None, "")
+
+        assert len(client.store) == 1
+        assert len(next(iter(client.store.values()))) == 2
+
+    def test_grouped_hash_expires_on_schedule_and_is_capped(self, trip):
+        client = FakeRedis()
+        cache = ResponseCache(
+            client, encoding="compact", group_by_cell=True, cell_buckets=1, max_fields=2
+        )
+        trips = [trip.model_copy(update={"passenger_count": n}) for n in (1, 2, 3)]
+
+        cache.set(cache.key(trips[0]), 858.04, None, "")
+        (name,) = client.ttls
+        client.ttls[name] = 10  # most of the TTL has elapsed
+        for data in trips[1:]:
+            cache.set(cache.key(data), 858.04, None, "")
+
+        assert client.ttls[name] == 10, "A write pushed the hash's expiry back."
+        assert len(client.store[name]) == 2
+        assert cache.get(cache.key(trips[2])) is None
+        assert cache.get(cache.key(trips[0])) is not None
+
+    def test_keys_carry_the_model_version(self, trip):
+        v1 = ResponseCache(None, encoding="compact", model_version="0a0b0c0d")
+        v2 = ResponseCache(None, encoding="compact", model_version="01020304")
+        assert v1.key(trip).startswith(bytes.fromhex("0a0b0c0d"))
+        assert v1.key(trip)[4:] == v2.key(trip)[4:]
+        assert (
+            ResponseCache(None, model_version="0a0b0c0d")
+            .key(trip)
+            .startswith("0a0b0c0d:")
+        )
+
+    def test_struct_key_separates_fields(self, trip):
+        cache = ResponseCache(None, encoding="compact")
+        swapped = trip.model_copy(
+            update={
+                "pickup_latitude": trip.dropoff_latitude,
+                "dropoff_latitude": trip.pickup_latitude,
+            }
+        )
+        assert cache.key(trip) != cache.key(swapped)
+        assert cache.key(trip) == cache.key(trip.model_copy())
+
+    def test_same_instant_in_any_format_shares_a_key(self, trip):
+        cache = ResponseCache(None, encoding="compact")
+
+        def at(value):
+            return cache.key(trip.model_copy(update={"pickup_datetime": value}))
+
+        assert at("2016-03-14T17:24:55") == cache.key(trip)
+        assert at("2016-03-14 17:24:55.000") == cache.key(trip)
+        assert at("2016-03-14 18:24:55") != cache.key(trip)
+        with pytest.raises(ValueError):
+            at("not a date")
+
+    @pytest.mark.parametrize(
+        "encoding, group_by_cell",
+        [("json", False), ("compact", False), ("compact", True)],
+    )
+    def test_legacy_keys_are_read_and_migrated(self, trip, encoding, group_by_cell):
+        client = FakeRedis()
+        # What the pre-versioned API wrote: hex MD5 of the trip's JSON -> JSON body
+        body = json.dumps(format_response(858.04, None))
+        client.setex(ResponseCache.legacy_key(trip), 3600, body)
+        assert len(ResponseCache.legacy_key(trip)) == 32
+
+        options = dict(encoding=encoding, group_by_cell=group_by_cell)
+        new = ResponseCache(client, model_version="0a0b0c0d", **options)
+        assert new.get(new.key(trip), trip) is None
+
+        migrating = ResponseCache(
+            client, model_version="0a0b0c0d", read_legacy=True, **options
+        )
+        assert json.loads(migrating.get(migrating.key(trip), trip)) == json.loads(body)
+        assert json.loads(new.get(new.key(trip))) == json.loads(body)
+
+    def test_unknown_encoding_is_rejected(self):
+        with pytest.raises(ValueError):
+            ResponseCache(None, encoding="pickle")
@@ -0,0 +1,57 @@
+import time
+
+from prometheus_client import REGISTRY
+
+from src.api.schemas import TaxiInput
+from src.api.shadow import ShadowScorer
+
+TRIP = TaxiInput(
+    pickup_datetime="2026-01-20 12:00:00",
+    pickup_longitude=-73.9857,
+    pickup_latitude=40.7484,
+    dropoff_longitude=-73.9665,
+    dropoff_latitude=40.7812,
+    passenger_count=1,
+)
+
+
+class SlowCandidate:
+    def predict(self, data):
+        time.sleep(0.05)
+        return 700.0, None
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestShadowScorer:
+    """
+    Unit Tests for shadow scoring: the candidate runs off the request path
+    and its latency/prediction delta end up in the metrics.
+    """
+
+    def test_submit_returns_before_candidate_runs(self):
+        scored_before = _sample("shadow_requests_total", result="scored")
+        scorer = ShadowScorer(SlowCandidate(), sample_rate=1.0)
+
+        start = time.perf_counter()
+        scorer.submit(TRIP, primary_seconds=600.0, primary_latency=0.001)
+        assert time.perf_counter() - start < 0.05, "submit() waited for the candidate."
+
+        scorer.close(wait=True)
+        assert _sample("shadow_requests_total", result="scored") == scored_before + 1
+
+    def test_samples_are_dropped_when_queue_is_full(self):
+        dropped_before = _sample("shadow_requests_total", result="dropped")
+        scorer = ShadowScorer(SlowCandidate(), sample_rate=1.0, max_pending=1)
+
+        for _ in range(3):
+            scorer.submit(TRIP, primary_seconds=600.0, primary_latency=0.001)
+
+        scorer.close(wait=True)
+        assert _sample("shadow_requests_total", result="dropped") == dropped_before + 2
+
+    def test_canary_weight_bounds(self):
+        assert not ShadowScorer(SlowCandidate(), canary_weight=0.0).route_canary()
+        assert ShadowScorer(SlowCandidate(), canary_weight=1.0).route_canary()
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.model_selection import train_test_split
+
+from src.components.training_data import build_training_matrix, peak_rss_mb
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "a": rng.normal(size=101),
+            "b": rng.integers(0, 24, size=101),
+            "target": rng.normal(size=101),
+        }
+    )
+
+
+class TestBuildTrainingMatrix:
+    """
+    Unit Tests for the float32 training matrix:
+    same split as train_test_split, without copying the feature matrix.
+    """
+
+    def test_matches_train_test_split(self, frame):
+        X_train, X_test, y_train, y_test = build_training_matrix(
+            frame, ["a", "b"], "target", 0.2, 42
+        )
+        expected = train_test_split(
+            frame[["a", "b"]], frame["target"], test_size=0.2, random_state=42
+        )
+
+        np.testing.assert_array_equal(X_train, expected[0].to_numpy(np.float32))
+        np.testing.assert_array_equal(X_test, expected[1].to_numpy(np.float32))
+        np.testing.assert_array_equal(y_train, expected[2].to_numpy())
+        np.testing.assert_array_equal(y_test, expected[3].to_numpy())
+
+    def test_splits_are_contiguous_float32_views(self, frame):
+        X_train, X_test, _, _ = build_training_matrix(
+            frame, ["a", "b"], "target", 0.2, 42
+        )
+
+        assert X_train.dtype == np.float32
+        assert X_train.flags["C_CONTIGUOUS"] and X_test.flags["C_CONTIGUOUS"]
+        assert X_train.base is not None and X_train.base is X_test.base
+
+    def test_peak_rss_is_reported(self):
+        assert peak_rss_mb() > 0